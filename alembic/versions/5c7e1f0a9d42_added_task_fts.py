@@ -0,0 +1,66 @@
+"""Added task fts
+
+Revision ID: 5c7e1f0a9d42
+Revises: bbadaa024833
+Create Date: 2026-10-18 05:40:27.104518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e1f0a9d42'
+down_revision: Union[str, None] = 'bbadaa024833'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Пересоздание task в batch-миграциях удаляет триггеры: после такой
+    # миграции их нужно создать заново и сделать 'rebuild'
+    op.execute(
+        """CREATE VIEW task_fts_content AS
+        SELECT id, name, text_of_task, 'u' || user_id AS owner FROM task"""
+    )
+    op.execute(
+        """CREATE VIRTUAL TABLE task_fts USING fts5(
+            name, text_of_task, owner,
+            content='task_fts_content', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )"""
+    )
+    op.execute(
+        """CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN
+            INSERT INTO task_fts(rowid, name, text_of_task, owner)
+            VALUES (new.id, new.name, new.text_of_task, 'u' || new.user_id);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN
+            INSERT INTO task_fts(task_fts, rowid, name, text_of_task, owner)
+            VALUES ('delete', old.id, old.name, old.text_of_task, 'u' || old.user_id);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER task_fts_update
+        AFTER UPDATE OF name, text_of_task, user_id ON task BEGIN
+            INSERT INTO task_fts(task_fts, rowid, name, text_of_task, owner)
+            VALUES ('delete', old.id, old.name, old.text_of_task, 'u' || old.user_id);
+            INSERT INTO task_fts(rowid, name, text_of_task, owner)
+            VALUES (new.id, new.name, new.text_of_task, 'u' || new.user_id);
+        END"""
+    )
+    # Индекс по уже существующим задачам
+    op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS task_fts_update')
+    op.execute('DROP TRIGGER IF EXISTS task_fts_delete')
+    op.execute('DROP TRIGGER IF EXISTS task_fts_insert')
+    op.execute('DROP TABLE IF EXISTS task_fts')
+    op.execute('DROP VIEW IF EXISTS task_fts_content')
@@ -0,0 +1,33 @@
+"""Added task user index
+
+Revision ID: bbadaa024833
+Revises: 4e65e3c236c0
+Create Date: 2026-10-18 04:50:12.318589
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbadaa024833'
+down_revision: Union[str, None] = '4e65e3c236c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_task_user_id_created_at_id',
+        'task',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_user_id_created_at_id', table_name='task')
@@ -0,0 +1,45 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.const import TASKS_PAGE_LIMIT, TASKS_PAGE_MAX_LIMIT
+from app.core.db import get_async_read_session
+from app.core.user import current_superuser
+from app.crud.user import crud_user
+from app.schemas.user import UserRead, UserWithTaskCount, UserWithTasks
+
+router = APIRouter(
+    prefix='/admin',
+    tags=['admin'],
+    dependencies=[Depends(current_superuser)],
+)
+
+
+@router.get('/users', response_model=List[UserWithTaskCount])
+async def get_users_with_task_counts(
+    limit: int = Query(TASKS_PAGE_LIMIT, ge=1, le=TASKS_PAGE_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    rows = await crud_user.get_with_task_counts(
+        session=session, limit=limit, offset=offset
+    )
+    return [
+        UserWithTaskCount(
+            **UserRead.model_validate(user).model_dump(),
+            task_count=task_count,
+        )
+        for user, task_count in rows
+    ]
+
+
+@router.get('/users/{user_id}', response_model=UserWithTasks)
+async def get_user_with_tasks(
+    user_id: int,
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    user = await crud_user.get_with_tasks(user_id=user_id, session=session)
+    if user is None:
+        raise HTTPException(status_code=404, detail='Пользователь не найден')
+    return user
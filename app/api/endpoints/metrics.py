@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get(
+    '/metrics',
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+def get_metrics():
+    return PlainTextResponse(
+        metrics.render(), media_type='text/plain; version=0.0.4'
+    )
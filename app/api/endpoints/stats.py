@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+
+from app.core.db import engine, read_engine
+from app.core.pool import pool_stats
+from app.core.user import current_superuser, user_cache
+from app.crud.task import task_list_cache
+
+router = APIRouter(
+    prefix='/stats',
+    tags=['stats'],
+    dependencies=[Depends(current_superuser)],
+)
+
+
+@router.get('/db-pool')
+def get_db_pool_stats():
+    stats = {'write': pool_stats(engine)}
+    if read_engine is not None:
+        stats['read'] = pool_stats(read_engine)
+    return stats
+
+
+@router.get('/cache')
+def get_cache_stats():
+    return {
+        'user': user_cache.stats(),
+        'task_list': task_list_cache.stats(),
+    }
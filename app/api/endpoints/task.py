@@ -1,27 +1,88 @@
-from datetime import datetime
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.core.db import get_async_session
+from typing import List, Optional
+from app.core.const import (
+    TASKS_BULK_MAX_SIZE, TASKS_PAGE_LIMIT, TASKS_PAGE_MAX_LIMIT
+)
+from app.core.db import get_async_read_session, get_async_session
 from app.core.user import current_user
 from app.models.user import User
-from app.schemas.task import Task, TaskCreate
-from app.crud.task import crud_task
+from app.schemas.task import (
+    ExportFormat, Task, TaskCreate, TaskPage, TaskSearchPage
+)
+from app.services import task as task_service
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 @router.get(
     "/",
-    response_model=List[Task],
+    response_model=TaskPage,
     summary="Get tasks for the authenticated user",
 )
 async def get_user_tasks(
+    request: Request,
+    limit: int = Query(TASKS_PAGE_LIMIT, ge=1, le=TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
     user: User = Depends(current_user),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
-    tasks = await crud_task.get_all_by_user_id(user_id=user.id, session=session)
-    return tasks if tasks else []
+    try:
+        body, etag = await task_service.get_user_tasks_page_json(
+            user_id=user.id, session=session, limit=limit, cursor=cursor
+        )
+    except task_service.InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if task_service.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Stream all tasks of the authenticated user as NDJSON or CSV",
+)
+async def export_user_tasks(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    user: User = Depends(current_user),
+):
+    if export_format == ExportFormat.csv:
+        media_type, filename = "text/csv", "tasks.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "tasks.ndjson"
+    return StreamingResponse(
+        task_service.export_user_tasks(user_id=user.id, export_format=export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get(
+    "/search",
+    response_model=TaskSearchPage,
+    summary="Full-text search over the authenticated user's tasks",
+)
+async def search_user_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(TASKS_PAGE_LIMIT, ge=1, le=TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    user: User = Depends(current_user),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    try:
+        hits, next_cursor = await task_service.search_user_tasks(
+            user_id=user.id, session=session, query=q, limit=limit,
+            cursor=cursor,
+        )
+    except (task_service.InvalidCursor, task_service.InvalidSearchQuery) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+    return {"items": hits, "next_cursor": next_cursor}
 
 @router.post(
     "/",
@@ -34,14 +95,27 @@ async def create_task(
     user: User = Depends(current_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    # Set created_at to current UTC time
-    created_at = datetime.utcnow()
-
-    # Create task
-    task = await crud_task.create(
+    return await task_service.create_user_task(
         task_in=task_in,
         user_id=user.id,
-        created_at=created_at,
         session=session
     )
-    return task
\ No newline at end of file
+
+@router.post(
+    "/bulk",
+    response_model=List[Task],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create several tasks for the authenticated user in one transaction",
+)
+async def create_tasks_bulk(
+    tasks_in: List[TaskCreate] = Body(
+        ..., min_length=1, max_length=TASKS_BULK_MAX_SIZE
+    ),
+    user: User = Depends(current_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await task_service.create_user_tasks(
+        tasks_in=tasks_in,
+        user_id=user.id,
+        session=session
+    )
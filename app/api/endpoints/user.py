@@ -15,6 +15,8 @@ router.include_router(
     prefix='/auth',
     tags=['auth'],
 )
+
+
 router.include_router(
     fastapi_users.get_users_router(UserRead, UserUpdate),
     prefix='/users',
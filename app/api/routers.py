@@ -2,8 +2,14 @@ from fastapi import APIRouter
 
 from app.api.endpoints.user import router as user_router
 from app.api.endpoints.task import router as task_router
+from app.api.endpoints.stats import router as stats_router
+from app.api.endpoints.metrics import router as metrics_router
+from app.api.endpoints.admin import router as admin_router
 
 main_router = APIRouter()
 
 main_router.include_router(user_router)
-main_router.include_router(task_router)
\ No newline at end of file
+main_router.include_router(task_router)
+main_router.include_router(stats_router)
+main_router.include_router(metrics_router)
+main_router.include_router(admin_router)
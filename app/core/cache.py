@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """LRU-кэш с TTL, рассчитан на один event loop (без блокировок)."""
+
+    def __init__(self, maxsize: int, ttl: Optional[float]):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class OwnerCache:
+    """Кэш, в котором все записи одного владельца сбрасываются разом."""
+
+    def __init__(self, max_owners: int, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._owners = LRUCache(max_owners, ttl=None)
+
+    def bucket(self, owner: Hashable) -> LRUCache:
+        bucket = self._owners.get(owner)
+        if bucket is None:
+            bucket = LRUCache(self.max_entries, self.ttl)
+            self._owners.set(owner, bucket)
+        return bucket
+
+    def get(self, bucket: LRUCache, key: Hashable, default: Any = None) -> Any:
+        value = bucket.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(
+        self, owner: Hashable, bucket: LRUCache, key: Hashable, value: Any
+    ) -> None:
+        # Значение, посчитанное до инвалидации, не сохраняем
+        if self._owners.get(owner) is bucket:
+            bucket.set(key, value)
+
+    def invalidate(self, owner: Hashable) -> None:
+        self._owners.delete(owner)
+
+    def clear(self) -> None:
+        self._owners.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'owners': len(self._owners),
+        }
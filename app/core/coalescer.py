@@ -0,0 +1,145 @@
+import asyncio
+import contextvars
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.db import insert_returning
+
+logger = logging.getLogger(__name__)
+
+Pending = Tuple[Dict[str, Any], asyncio.Future]
+
+
+class InsertCoalescer:
+    """Group commit: вставки из параллельных запросов идут одной транзакцией.
+
+    Пачка закрывается через max_delay секунд после первой строки или
+    на max_batch строках. Пока пачка пишется, следующая уже копится.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        engine: AsyncEngine,
+        max_delay: float,
+        max_batch: int,
+        on_commit: Optional[Callable[[Sequence[Row]], None]] = None,
+    ):
+        self.table = table
+        self.engine = engine
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.on_commit = on_commit
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, values: Dict[str, Any]) -> Row:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+        # Очередь остаётся прежней: строки, ждущие упавшего воркера,
+        # запишет новый
+        if self._worker is None or self._worker.done():
+            # Пустой контекст: воркер не должен числиться за первым запросом
+            self._worker = contextvars.Context().run(
+                asyncio.create_task, self._run()
+            )
+        future = loop.create_future()
+        await self._queue.put((values, future))
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is None or self._loop is not asyncio.get_running_loop():
+            self._worker = None
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _collect(self) -> List[Pending]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        # Всё, что накопилось за время прошлой записи, берём сразу
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # Воркер живёт дальше, а вызовы из пачки не ждут вечно
+                logger.exception(
+                    'Coalesced insert of %d rows failed', len(batch)
+                )
+                self._fail(batch, e)
+            except BaseException:
+                self._fail(batch, None)
+                raise
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _fail(batch: List[Pending], error: Optional[BaseException]) -> None:
+        for _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[Row]:
+        async with self.engine.begin() as conn:
+            return await insert_returning(conn, self.table, rows)
+
+    async def _flush(self, batch: List[Pending]) -> None:
+        try:
+            results = await self._insert([values for values, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                future = batch[0][1]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # Одна плохая строка не должна ронять чужие вставки
+            logger.warning(
+                'Coalesced insert of %d rows failed, retrying one by one: %s',
+                len(batch), e
+            )
+            for item in batch:
+                await self._flush([item])
+            return
+        if self.on_commit is not None:
+            try:
+                self.on_commit(results)
+            except Exception:
+                # Строки уже записаны: вызовы получат их и без on_commit
+                logger.exception('on_commit failed after coalesced insert')
+        for (_, future), row in zip(batch, results):
+            if not future.done():
+                future.set_result(row)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import EmailStr
 from pydantic.v1 import BaseSettings
@@ -9,8 +9,68 @@ class Settings(BaseSettings):
     app_title: str = 'Дз'
     description: str = 'ДЗ'
     database_url: str
+    database_read_url: Optional[str] = None
+    json_fast_path: bool = False
+    metrics_enabled: bool = True
+    slow_query_ms: float = 200
+    # off, warn или raise (в тестах)
+    query_guard: str = 'warn'
+    query_budget: int = 30
+    query_repeat_limit: int = 5
+    log_level: str = 'INFO'
+    # {"имя логгера": доля INFO/DEBUG записей, которые пишутся}
+    log_sample_rates: Dict[str, float] = {}
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_busy_timeout: int = 5000
+    sqlite_mmap_size: int = 268435456
+    sqlite_cache_size: int = -64000
+    sqlite_temp_store: str = 'MEMORY'
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_expire_on_commit: bool = False
+    task_write_coalescing: bool = False
+    task_write_max_delay: float = 0.002
+    task_write_max_batch: int = 100
     secret: str
     bot_tockn: str
+    api_base_url: str = 'http://localhost:8000'
+    bot_api_timeout: float = 10
+    bot_api_connect_timeout: float = 5
+    bot_api_connections_limit: int = 100
+    bot_api_keepalive_timeout: float = 30
+    bot_mode: str = 'polling'
+    bot_webhook_url: Optional[str] = None
+    bot_webhook_path: str = '/webhook'
+    bot_webhook_host: str = '0.0.0.0'
+    bot_webhook_port: int = 8080
+    bot_webhook_secret: Optional[str] = None
+    bot_webhook_max_concurrency: int = 100
+    bot_webhook_backlog: int = 1000
+    bot_max_concurrent_updates: int = 100
+    # Раз в столько секунд очереди бота пишутся в лог; 0 — не писать
+    bot_stats_interval: float = 60
+    bot_send_global_rate: float = 30
+    bot_send_chat_rate: float = 1
+    bot_send_chat_burst: int = 3
+    bot_send_workers: int = 8
+    bot_fsm_db_path: str = 'bot_fsm.db'
+    bot_fsm_flush_interval: float = 1
+    bot_fsm_cache_size: int = 10000
+    task_cache_ttl: float = 30
+    task_cache_max_users: int = 1024
+    task_cache_max_pages: int = 16
+    user_cache_ttl: float = 60
+    user_cache_max_users: int = 4096
+    user_cache_max_tokens: int = 4
+    password_hash_algorithm: str = 'argon2'
+    password_hash_workers: Optional[int] = None
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    bcrypt_rounds: int = 12
 
     class Config:
         env_file = '.env'
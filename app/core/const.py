@@ -1,4 +1,15 @@
 LOG_FORM = '%(asctime)s, %(levelname)s, %(message)s'
-LOG_FILEMOD = 'w'
+LOG_FILEMOD = 'a'
 LOG_FILENAME = 'logger.log'
-TOKEN_EXECT = 'Token is invalid!'
\ No newline at end of file
+LOG_BODY_LIMIT = 500
+TOKEN_EXECT = 'Token is invalid!'
+TASKS_PAGE_LIMIT = 50
+TASKS_PAGE_MAX_LIMIT = 500
+TASKS_BULK_MAX_SIZE = 1000
+TASKS_EXPORT_CHUNK_SIZE = 500
+TASKS_SEARCH_MAX_TERMS = 10
+TASKS_SEARCH_SNIPPET_TOKENS = 12
+BOT_TASKS_PAGE_SIZE = 5
+BOT_TASK_TEXT_PREVIEW = 500
+BOT_TASK_NAME_PREVIEW = 200
+TELEGRAM_MESSAGE_LIMIT = 4096
@@ -1,8 +1,15 @@
-from sqlalchemy import Column, Integer
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import Column, Integer, Table, event, insert
+from sqlalchemy.engine import Row, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+)
 from sqlalchemy.orm import declarative_base, declared_attr, sessionmaker
 
 from app.core.config import settings
+from app.core.pool import InstrumentedAsyncPool
 
 
 class PreBase:
@@ -16,11 +23,94 @@ class PreBase:
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
 
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
+async def insert_returning(
+    connection: Union[AsyncConnection, AsyncSession],
+    table: Table,
+    rows: List[Dict[str, Any]],
+) -> List[Row]:
+    """Один INSERT ... RETURNING на все rows; строки в порядке rows.
+
+    sort_by_parameter_order на SQLite дробит пачку на INSERT на строку,
+    поэтому сортируем по ключу: автоинкремент растёт в порядке VALUES.
+    """
+    result = await connection.execute(insert(table).returning(*table.c), rows)
+    return sorted(
+        result.all(),
+        key=attrgetter(*(column.name for column in table.primary_key)),
+    )
+
+
+def sqlite_pragmas(read_only: bool = False) -> dict:
+    pragmas = {
+        'journal_mode': settings.sqlite_journal_mode,
+        'synchronous': settings.sqlite_synchronous,
+        'busy_timeout': settings.sqlite_busy_timeout,
+        'mmap_size': settings.sqlite_mmap_size,
+        'cache_size': settings.sqlite_cache_size,
+        'temp_store': settings.sqlite_temp_store,
+    }
+    if read_only:
+        pragmas['query_only'] = 'ON'
+    return pragmas
+
+
+def engine_options(url: str) -> dict:
+    options = {
+        'pool_pre_ping': settings.db_pool_pre_ping,
+        'pool_recycle': settings.db_pool_recycle,
+    }
+    # In-memory SQLite живёт на одном соединении (StaticPool), без размеров
+    if make_url(url).database not in (None, '', ':memory:'):
+        options.update(
+            poolclass=InstrumentedAsyncPool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+def make_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    async_engine = create_async_engine(url, **engine_options(url))
+    if make_url(url).get_backend_name() != 'sqlite':
+        return async_engine
+    pragmas = sqlite_pragmas(read_only)
+
+    # PRAGMA действуют на соединение, поэтому ставим их на каждом новом
+    @event.listens_for(async_engine.sync_engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return async_engine
+
+
+engine = make_engine(settings.database_url)
+
+# Отдельный движок для чтения: списки задач не ждут соединений писателя
+read_engine: Optional[AsyncEngine] = None
+if settings.database_read_url:
+    read_engine = make_engine(settings.database_read_url, read_only=True)
+
+AsyncSessionLocal = sessionmaker(
+    engine, class_=AsyncSession,
+    expire_on_commit=settings.db_expire_on_commit,
+)
+
+AsyncReadSessionLocal = sessionmaker(
+    read_engine or engine, class_=AsyncSession,
+    expire_on_commit=settings.db_expire_on_commit,
+)
 
 
 async def get_async_session():
     async with AsyncSessionLocal() as async_session:
-        yield async_session
\ No newline at end of file
+        yield async_session
+
+
+async def get_async_read_session():
+    async with AsyncReadSessionLocal() as async_session:
+        yield async_session
@@ -0,0 +1,26 @@
+"""Быстрый путь JSON (JSON_FAST_PATH): orjson вместо json/pydantic.
+
+orjson — необязательная зависимость, нужна только при включённом флаге.
+"""
+from typing import Any, Type
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def response_class() -> Type[JSONResponse]:
+    if not settings.json_fast_path:
+        return JSONResponse
+    if orjson is None:
+        raise RuntimeError('JSON_FAST_PATH включён, но orjson не установлен')
+    return ORJSONResponse
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value)
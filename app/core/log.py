@@ -0,0 +1,102 @@
+import atexit
+import logging
+import queue
+import random
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from app.core.const import LOG_BODY_LIMIT, LOG_FILEMOD, LOG_FILENAME, LOG_FORM
+
+SECRETS = (
+    # JWT: header.payload.signature
+    (re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+'), '<jwt>'),
+    # Токен Telegram-бота
+    (re.compile(r'\b\d{6,}:[\w-]{30,}\b'), '<bot-token>'),
+    (re.compile(r'(Bearer\s+)\S+', re.IGNORECASE), r'\1<token>'),
+)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_samplers: List[Tuple[logging.Logger, logging.Filter]] = []
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in SECRETS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def truncate(text: str, limit: int = LOG_BODY_LIMIT) -> str:
+    if len(text) <= limit:
+        return text
+    return f'{text[:limit]}… ({len(text)} chars)'
+
+
+class RedactingFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает долю rate записей ниже WARNING, остальные — всегда."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def setup_logging(
+    level: str, sample_rates: Dict[str, float]
+) -> QueueListener:
+    """Логи пишет отдельный поток: в event loop только постановка в очередь.
+
+    Формат LOG_FORM, вырезание токенов и запись в файл выполняются
+    в потоке слушателя. Повторный вызов ничего не меняет.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+    formatter = RedactingFormatter(LOG_FORM)
+    # Файл общий для воркеров API и бота: только дописываем, не обрезаем
+    file_handler = logging.FileHandler(
+        LOG_FILENAME, mode=LOG_FILEMOD, encoding='utf-8'
+    )
+    stream_handler = logging.StreamHandler(sys.stderr)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    for name, rate in sample_rates.items():
+        sampler = SamplingFilter(rate)
+        logging.getLogger(name).addFilter(sampler)
+        _samplers.append((logging.getLogger(name), sampler))
+    _listener = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Дописывает очередь и останавливает поток слушателя."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    for logger, sampler in _samplers:
+        logger.removeFilter(sampler)
+    _samplers.clear()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
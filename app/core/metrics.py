@@ -0,0 +1,271 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Гистограммы — заранее выделенные массивы счётчиков, на запрос
+приходится один поиск по словарю маршрутов и несколько сложений.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.pool import pool_stats
+from app.core.query_log import QueryGuard, log_slow_query
+
+REQUEST_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0
+)
+UNMATCHED_ROUTE = '<unmatched>'
+POOL_GAUGES = ('size', 'checked_out', 'checked_in', 'overflow')
+POOL_COUNTERS = ('checkouts', 'timeouts')
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # Последняя ячейка — всё, что больше верхней границы (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str, lines: List[str]) -> None:
+        prefix = labels + ',' if labels else ''
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {self.sum}')
+        lines.append(f'{name}_count{suffix} {self.count}')
+
+
+class RouteMetrics:
+    __slots__ = ('latency', 'db_time', 'db_queries', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram(REQUEST_BUCKETS)
+        self.db_time = Histogram(REQUEST_BUCKETS)
+        self.db_queries = 0
+        self.statuses: Dict[int, int] = {}
+
+
+class RequestStats:
+    """Запросы к БД в рамках одного HTTP-запроса (или watch_queries)."""
+
+    __slots__ = ('label', 'guard', 'queries', 'query_time', 'shapes', 'active')
+
+    def __init__(self, label: str = '', guard: Optional[QueryGuard] = None):
+        self.label = label
+        self.guard = guard
+        self.queries = 0
+        self.query_time = 0.0
+        self.shapes: Dict[str, int] = {}
+        self.active = True
+
+    def record(self, statement: str) -> None:
+        self.queries += 1
+        if self.guard is None:
+            return
+        # Текст с плейсхолдерами и есть «форма» запроса
+        repeats = self.shapes.get(statement, 0) + 1
+        self.shapes[statement] = repeats
+        self.guard.check(self.label, self.queries, repeats, statement)
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    'current_request', default=None
+)
+
+
+def label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class Metrics:
+    def __init__(self):
+        # False — только хук запросов для query_log, без серий по маршрутам
+        self.enabled = True
+        self.in_flight = 0
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.engines: List[Tuple[str, AsyncEngine]] = []
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        elapsed: float,
+        stats: RequestStats,
+    ) -> None:
+        if not self.enabled:
+            return
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.latency.observe(elapsed)
+        metrics.db_time.observe(stats.query_time)
+        metrics.db_queries += stats.queries
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def attach_engine(
+        self, name: str, engine: AsyncEngine, slow_query_ms: float
+    ) -> None:
+        """Единственный хук запросов на движке: метрики, guard, медленные."""
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            stats = current_request.get()
+            # Фоновые задачи наследуют контекст запроса, который их создал
+            if stats is not None and stats.active:
+                # guard бросает до выполнения: лишний запрос не уйдёт в БД
+                stats.record(statement)
+            context._metrics_started = time.perf_counter()
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            elapsed = time.perf_counter() - context._metrics_started
+            if self.enabled:
+                self.queries.observe(elapsed)
+            stats = current_request.get()
+            if stats is not None and stats.active:
+                stats.query_time += elapsed
+            if elapsed * 1000 >= slow_query_ms:
+                log_slow_query(statement, parameters, executemany, elapsed)
+
+        self.engines.append((name, engine))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        routes = sorted(self.routes.items())
+
+        lines.append('# TYPE http_requests_in_flight gauge')
+        lines.append(f'http_requests_in_flight {self.in_flight}')
+
+        lines.append('# TYPE http_requests_total counter')
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",'
+                    f'route="{label(route)}",status="{status}"}} {count}'
+                )
+
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for (method, route), metrics in routes:
+            metrics.latency.render(
+                'http_request_duration_seconds',
+                f'method="{method}",route="{label(route)}"', lines,
+            )
+
+        lines.append('# TYPE http_request_db_queries_total counter')
+        for (method, route), metrics in routes:
+            lines.append(
+                f'http_request_db_queries_total{{method="{method}",'
+                f'route="{label(route)}"}} {metrics.db_queries}'
+            )
+
+        lines.append('# TYPE http_request_db_seconds histogram')
+        for (method, route), metrics in routes:
+            metrics.db_time.render(
+                'http_request_db_seconds',
+                f'method="{method}",route="{label(route)}"', lines,
+            )
+
+        lines.append('# TYPE db_query_duration_seconds histogram')
+        self.queries.render('db_query_duration_seconds', '', lines)
+
+        stats = [(name, pool_stats(engine)) for name, engine in self.engines]
+        for key in POOL_GAUGES:
+            lines.append(f'# TYPE db_pool_{key} gauge')
+            lines.extend(
+                f'db_pool_{key}{{engine="{name}"}} {values[key]}'
+                for name, values in stats if key in values
+            )
+        for key in POOL_COUNTERS:
+            lines.append(f'# TYPE db_pool_{key}_total counter')
+            lines.extend(
+                f'db_pool_{key}_total{{engine="{name}"}} {values[key]}'
+                for name, values in stats if key in values
+            )
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def watch_queries(label: str, guard: QueryGuard) -> Iterator[RequestStats]:
+    """Проверки guard вне HTTP: в скриптах и тестах."""
+    stats = RequestStats(label, guard)
+    token = current_request.set(stats)
+    try:
+        yield stats
+    finally:
+        stats.active = False
+        current_request.reset(token)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: время, статус и запросы к БД по маршрутам.
+
+    Заводит RequestStats на запрос; с guard он же ловит N+1.
+    """
+
+    def __init__(self, app, metrics: Metrics, guard: Optional[QueryGuard]):
+        self.app = app
+        self.metrics = metrics
+        self.guard = guard
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        stats = RequestStats(
+            f"{scope['method']} {scope['path']}" if self.guard else '',
+            self.guard,
+        )
+        token = current_request.set(stats)
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_flight -= 1
+            stats.active = False
+            current_request.reset(token)
+            # Шаблон пути, а не сам путь: число серий не растёт
+            route = scope.get('route')
+            self.metrics.observe_request(
+                scope['method'],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status, elapsed, stats,
+            )
+
+
+metrics = Metrics()
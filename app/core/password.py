@@ -0,0 +1,57 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from app.core.config import settings
+
+
+def get_password_hash() -> PasswordHash:
+    argon2 = Argon2Hasher(
+        time_cost=settings.argon2_time_cost,
+        memory_cost=settings.argon2_memory_cost,
+    )
+    bcrypt = BcryptHasher(rounds=settings.bcrypt_rounds)
+    if settings.password_hash_algorithm == 'bcrypt':
+        # Первый хешер основной, старые хеши пересчитываются при логине
+        return PasswordHash((bcrypt, argon2))
+    if settings.password_hash_algorithm == 'argon2':
+        return PasswordHash((argon2, bcrypt))
+    raise ValueError(
+        f'Unknown password_hash_algorithm: {settings.password_hash_algorithm}'
+    )
+
+
+password_helper = PasswordHelper(get_password_hash())
+
+# argon2-cffi и bcrypt отпускают GIL, так что потоков достаточно.
+# По умолчанию одно ядро оставляем event loop
+_executor = ThreadPoolExecutor(
+    max_workers=(
+        settings.password_hash_workers
+        or max(1, (os.cpu_count() or 2) - 1)
+    ),
+    thread_name_prefix='password-hash',
+)
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, password_helper.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        password_helper.verify_and_update,
+        plain_password,
+        hashed_password,
+    )
@@ -0,0 +1,76 @@
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue
+
+
+class TimedQueue(AsyncAdaptedQueue):
+    """Очередь пула, которая меряет ожидание уже открытого соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        started = time.perf_counter()
+        # Empty (таймаут или повод открыть новое соединение) не считаем
+        record = super().get(block, timeout)
+        waited = time.perf_counter() - started
+        self.waits += 1
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+        return record
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Пул, который считает выдачи соединений, таймауты и ожидание.
+
+    checkouts — только успешные выдачи. Ожидание — время до выдачи
+    соединения из очереди: открытие нового соединения в него не входит.
+    """
+
+    _queue_class = TimedQueue
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def connect(self):
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        self.checkouts += 1
+        return connection
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {'pool': type(pool).__name__, 'status': pool.status()}
+    stats = {
+        'pool': type(pool).__name__,
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedAsyncPool):
+        queue = pool._pool
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            wait_avg_ms=round(
+                queue.wait_total / queue.waits * 1000, 3
+            ) if queue.waits else 0.0,
+            wait_max_ms=round(queue.wait_max * 1000, 3),
+        )
+    return stats
@@ -0,0 +1,72 @@
+"""Медленные запросы и N+1 поверх общего хука метрик.
+
+Хук на движке один (Metrics.attach_engine), он же ведёт RequestStats
+HTTP-запроса. Медленные (дольше SLOW_QUERY_MS) пишутся в лог с типами
+параметров, без значений. QueryGuard проверяет RequestStats перед каждым
+SQL-запросом: больше QUERY_BUDGET или один и тот же запрос больше
+QUERY_REPEAT_LIMIT раз — предупреждение, а при QUERY_GUARD=raise —
+QueryBudgetExceeded (для тестов и проверок). Вне HTTP то же даёт
+metrics.watch_queries().
+"""
+import logging
+
+from app.core.log import truncate
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryGuard:
+    __slots__ = ('budget', 'repeat_limit', 'raise_errors')
+
+    def __init__(self, budget: int, repeat_limit: int, raise_errors: bool):
+        self.budget = budget
+        self.repeat_limit = repeat_limit
+        self.raise_errors = raise_errors
+
+    def check(
+        self, label: str, queries: int, repeats: int, statement: str
+    ) -> None:
+        """queries — запросов с начала, repeats — из них с этим текстом."""
+        if queries == self.budget + 1:
+            self.report(
+                '%s: more than %d queries in one request', label, self.budget
+            )
+        if repeats == self.repeat_limit + 1:
+            self.report(
+                '%s: same statement ran more than %d times, likely N+1: %s',
+                label, self.repeat_limit, compact(statement),
+            )
+
+    def report(self, message: str, *args) -> None:
+        if self.raise_errors:
+            raise QueryBudgetExceeded(message % args)
+        logger.warning(message, *args)
+
+
+def compact(statement: str) -> str:
+    return truncate(' '.join(statement.split()))
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    """Типы параметров вместо значений: в логе не будет данных."""
+    if executemany:
+        if not parameters:
+            return '[]'
+        return f'{len(parameters)} x {parameter_shape(parameters[0], False)}'
+    if isinstance(parameters, dict):
+        parameters = parameters.values()
+    return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+
+
+def log_slow_query(
+    statement: str, parameters, executemany: bool, elapsed: float
+) -> None:
+    logger.warning(
+        'Slow query %.1f ms: %s params=%s',
+        elapsed * 1000, compact(statement),
+        parameter_shape(parameters, executemany),
+    )
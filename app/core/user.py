@@ -1,20 +1,34 @@
-from typing import Optional, Union
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Union
 
+import jwt
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (
-    BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException
+    BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException,
+    exceptions
 )
 from fastapi_users.authentication import (
     AuthenticationBackend, BearerTransport, JWTStrategy
 )
+from fastapi_users.jwt import decode_jwt
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import OwnerCache
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.password import (
+    hash_password, password_helper, verify_and_update_password
+)
 from app.models.user import User
 from app.schemas.user import UserCreate
 
+logger = logging.getLogger(__name__)
+
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     yield SQLAlchemyUserDatabase(session, User)
@@ -23,11 +37,122 @@ async def get_user_db(session: AsyncSession = Depends(get_async_session)):
 bearer_transport = BearerTransport(tokenUrl='auth/jwt/login')
 
 
+# Проверенные пользователи по user_id и отпечатку токена
+user_cache = OwnerCache(
+    max_owners=settings.user_cache_max_users,
+    max_entries=settings.user_cache_max_tokens,
+    ttl=settings.user_cache_ttl,
+)
+
+
+def token_fingerprint(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+    }
+
+
+def restore_user(snapshot: Dict[str, Any]) -> User:
+    # Каждому запросу своя копия: объект можно добавить в его сессию
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+class CachedJWTStrategy(JWTStrategy):
+    """JWT проверяется всегда, SELECT пользователя — только при промахе."""
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[User, int]
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience,
+                algorithms=[self.algorithm]
+            )
+            user_id = user_manager.parse_id(data['sub'])
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            return None
+
+        bucket = user_cache.bucket(user_id)
+        fingerprint = token_fingerprint(token)
+        snapshot = user_cache.get(bucket, fingerprint)
+        if snapshot is not None:
+            return restore_user(snapshot)
+        try:
+            user = await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+        user_cache.set(user_id, bucket, fingerprint, snapshot_user(user))
+        return user
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=settings.secret, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=settings.secret, lifetime_seconds=3600)
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
+    # create, authenticate и _update повторяют базовые, но хешируют
+    # пароль в пуле потоков, а не в event loop
+
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop('password')
+        user_dict['hashed_password'] = await hash_password(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хешируем впустую, чтобы время ответа не выдавало email
+            await hash_password(credentials.password)
+            return None
+
+        verified, updated_password_hash = await verify_and_update_password(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(
+                user, {'hashed_password': updated_password_hash}
+            )
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        password = update_dict.pop('password', None)
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict['hashed_password'] = await hash_password(password)
+        return await super()._update(user, update_dict)
+
     async def validate_password(
         self,
         password: str,
@@ -45,11 +170,32 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     async def on_after_register(
             self, user: User, request: Optional[Request] = None
     ):
-        print(f'Пользователь {user.email} зарегистрирован.')
+        logger.info('Пользователь %s зарегистрирован.', user.email)
+
+    async def on_after_update(
+            self, user: User, update_dict: Dict[str, Any],
+            request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_before_delete(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
 
 
 async def get_user_manager(user_db=Depends(get_user_db)):
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
 
 auth_backend = AuthenticationBackend(
     name='jwt',
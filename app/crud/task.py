@@ -1,10 +1,23 @@
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import select, desc
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import Select, select, desc, text, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from app.core.cache import OwnerCache
+from app.core.coalescer import InsertCoalescer
+from app.core.config import settings
+from app.core.const import TASKS_SEARCH_SNIPPET_TOKENS
+from app.core.db import engine, insert_returning
 from app.models.task import Task
 from app.schemas.task import TaskCreate
 
+# Списки задач по user_id; сбрасывается при любой записи задач пользователя
+task_list_cache = OwnerCache(
+    max_owners=settings.task_cache_max_users,
+    max_entries=settings.task_cache_max_pages,
+    ttl=settings.task_cache_ttl,
+)
+
 
 class CRUDBase:
     def __init__(self, model):
@@ -16,11 +29,106 @@ class CRUDBase:
         )
         return db_objects.scalars().first()
 
-    async def get_all_by_user_id(self, user_id: int, session: AsyncSession) -> List:
-        db_objects = await session.execute(
-            select(self.model).where(self.model.user_id == user_id).order_by(desc(self.model.created_at))
+    # Только для чтения: колонки вместо сущностей. Row не попадают
+    # в identity map сессии, связи (user) не грузятся вовсе.
+
+    @property
+    def columns(self) -> tuple:
+        return tuple(self.model.__table__.c)
+
+    async def get_all_rows_by_user_id(
+        self, user_id: int, session: AsyncSession
+    ) -> Sequence[Row]:
+        result = await session.execute(
+            self._list_query(select(*self.columns), user_id)
+        )
+        return result.all()
+
+    async def get_page_rows_by_user_id(
+        self,
+        user_id: int,
+        session: AsyncSession,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> Sequence[Row]:
+        result = await session.execute(
+            self._page_query(select(*self.columns), user_id, limit, after)
+        )
+        return result.all()
+
+    async def stream_rows_by_user_id(
+        self, user_id: int, session: AsyncSession, chunk_size: int
+    ) -> AsyncResult:
+        return await session.stream(
+            self._list_query(select(*self.columns), user_id)
+            .execution_options(yield_per=chunk_size)
+        )
+
+    async def search_rows(
+        self,
+        match: str,
+        session: AsyncSession,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Row]:
+        """Задачи по FTS5-запросу match, лучшие первыми (bm25, name весомее).
+
+        Фильтр по пользователю — часть match, см. TASK_FTS_CREATE.
+        snippet() считается только для строк страницы: CROSS JOIN не даёт
+        планировщику снова пройти по всем совпадениям вместо поиска по rowid.
+        """
+        after_score, after_id = after if after is not None else (None, None)
+        columns = ', '.join(f'task.{column.name}' for column in self.columns)
+        result = await session.execute(
+            text(f"""
+                WITH page AS MATERIALIZED (
+                    SELECT id, score FROM (
+                        SELECT rowid AS id,
+                            bm25(task_fts, 10.0, 1.0, 0.0) AS score
+                        FROM task_fts
+                        WHERE task_fts MATCH :match
+                    )
+                    WHERE :after_id IS NULL
+                        OR (score, id) > (:after_score, :after_id)
+                    ORDER BY score, id
+                    LIMIT :limit
+                )
+                SELECT {columns}, page.score,
+                    snippet(
+                        task_fts, -1, '[', ']', '…',
+                        {TASKS_SEARCH_SNIPPET_TOKENS}
+                    ) AS snippet
+                FROM page
+                CROSS JOIN task_fts ON task_fts.rowid = page.id
+                JOIN task ON task.id = page.id
+                WHERE task_fts MATCH :match
+                ORDER BY page.score, page.id
+            """),
+            {
+                'match': match, 'limit': limit,
+                'after_score': after_score, 'after_id': after_id,
+            },
+        )
+        return result.all()
+
+    def _list_query(self, query: Select, user_id: int) -> Select:
+        return query.where(self.model.user_id == user_id).order_by(
+            desc(self.model.created_at), desc(self.model.id)
         )
-        return db_objects.scalars().all()
+
+    def _page_query(
+        self,
+        query: Select,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+    ) -> Select:
+        # keyset-пагинация по (created_at, id), без OFFSET
+        if after is not None:
+            query = query.where(
+                tuple_(self.model.created_at, self.model.id) < tuple_(*after)
+            )
+        return self._list_query(query, user_id).limit(limit)
 
     async def create(self, task_in: TaskCreate, user_id: int, created_at: datetime, session: AsyncSession) -> Task:
         db_task = self.model(
@@ -31,8 +139,57 @@ class CRUDBase:
         )
         session.add(db_task)
         await session.commit()
-        await session.refresh(db_task)
+        task_list_cache.invalidate(user_id)
+        # Без expire_on_commit все поля уже на месте, id выставлен при flush
+        if session.sync_session.expire_on_commit:
+            await session.refresh(db_task)
         return db_task
 
+    async def create_coalesced(
+        self, task_in: TaskCreate, user_id: int, created_at: datetime
+    ):
+        # Сессия не нужна: строку пишет общий InsertCoalescer
+        return await task_write_coalescer.submit({
+            'name': task_in.name,
+            'text_of_task': task_in.text_of_task,
+            'user_id': user_id,
+            'created_at': created_at,
+        })
+
+    async def create_many(
+        self,
+        tasks_in: List[TaskCreate],
+        user_id: int,
+        created_at: datetime,
+        session: AsyncSession,
+    ) -> List:
+        # Один INSERT ... RETURNING на всю пачку и один commit
+        db_tasks = await insert_returning(session, self.model.__table__, [
+            {
+                'name': task_in.name,
+                'text_of_task': task_in.text_of_task,
+                'user_id': user_id,
+                'created_at': created_at,
+            }
+            for task_in in tasks_in
+        ])
+        await session.commit()
+        task_list_cache.invalidate(user_id)
+        return db_tasks
+
+
+def invalidate_task_lists(rows) -> None:
+    for user_id in {row.user_id for row in rows}:
+        task_list_cache.invalidate(user_id)
+
+
+# Включается settings.task_write_coalescing, см. services.task.create_user_task
+task_write_coalescer = InsertCoalescer(
+    Task.__table__,
+    engine,
+    max_delay=settings.task_write_max_delay,
+    max_batch=settings.task_write_max_batch,
+    on_commit=invalidate_task_lists,
+)
 
-crud_task = CRUDBase(Task)
\ No newline at end of file
+crud_task = CRUDBase(Task)
@@ -0,0 +1,50 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.task import Task
+from app.models.user import User
+
+
+class CRUDUser:
+    """Чтение пользователей для админки; запись — через fastapi-users."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def get(
+        self, user_id: int, session: AsyncSession, options: Sequence = ()
+    ) -> Optional[User]:
+        # Связи в моделях lazy='raise': что нужно, грузим явно через options
+        db_objects = await session.execute(
+            select(self.model).where(self.model.id == user_id).options(*options)
+        )
+        return db_objects.scalars().first()
+
+    async def get_with_task_counts(
+        self, session: AsyncSession, limit: int, offset: int = 0
+    ) -> Sequence[Row]:
+        # Один запрос с GROUP BY вместо загрузки задач каждого пользователя
+        result = await session.execute(
+            select(self.model, func.count(Task.id).label('task_count'))
+            .outerjoin(Task, Task.user_id == self.model.id)
+            .group_by(self.model.id)
+            .order_by(self.model.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return result.all()
+
+    async def get_with_tasks(
+        self, user_id: int, session: AsyncSession
+    ) -> Optional[User]:
+        # Задачи вторым запросом: selectinload не умножает строки как JOIN
+        return await self.get(
+            user_id, session, options=(selectinload(self.model.reservations),)
+        )
+
+
+crud_user = CRUDUser(User)
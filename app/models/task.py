@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 
 from app.core.db import Base
@@ -10,5 +10,59 @@ class Task(Base):
     user_id = Column(Integer, ForeignKey('user.id'))
     created_at = Column(DateTime, autoincrement=True)
     close = Column(DateTime)
-    user = relationship('User', back_populates='reservations')
+    user = relationship('User', back_populates='reservations', lazy='raise')
 
+
+# Под выборки списка задач: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+Index(
+    'ix_task_user_id_created_at_id',
+    Task.user_id,
+    Task.created_at.desc(),
+    Task.id.desc(),
+)
+
+# Полнотекстовый поиск (SQLite FTS5) по name и text_of_task. Индекс
+# external content: текст хранится только в task, task_fts держит токены.
+# Колонка owner = 'u<user_id>' нужна, чтобы фильтр по пользователю
+# работал внутри FTS, а не после поиска по всем задачам.
+# Для существующих баз то же создаёт миграция task_fts.
+TASK_FTS_CREATE = (
+    """CREATE VIEW IF NOT EXISTS task_fts_content AS
+    SELECT id, name, text_of_task, 'u' || user_id AS owner FROM task""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        name, text_of_task, owner,
+        content='task_fts_content', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, name, text_of_task, owner)
+        VALUES (new.id, new.name, new.text_of_task, 'u' || new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, name, text_of_task, owner)
+        VALUES ('delete', old.id, old.name, old.text_of_task, 'u' || old.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_update
+    AFTER UPDATE OF name, text_of_task, user_id ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, name, text_of_task, owner)
+        VALUES ('delete', old.id, old.name, old.text_of_task, 'u' || old.user_id);
+        INSERT INTO task_fts(rowid, name, text_of_task, owner)
+        VALUES (new.id, new.name, new.text_of_task, 'u' || new.user_id);
+    END""",
+)
+# Триггеры удаляются вместе с task
+TASK_FTS_DROP = (
+    'DROP TABLE IF EXISTS task_fts',
+    'DROP VIEW IF EXISTS task_fts_content',
+)
+
+for statement in TASK_FTS_CREATE:
+    event.listen(
+        Task.__table__, 'after_create',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
+for statement in TASK_FTS_DROP:
+    event.listen(
+        Task.__table__, 'before_drop',
+        DDL(statement).execute_if(dialect='sqlite'),
+    )
@@ -5,4 +5,4 @@ from app.core.db import Base
 
 
 class User(SQLAlchemyBaseUserTable[int], Base):
-    reservations = relationship('Task', back_populates='user')
\ No newline at end of file
+    reservations = relationship('Task', back_populates='user', lazy='raise')
\ No newline at end of file
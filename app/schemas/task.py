@@ -1,6 +1,8 @@
+from enum import Enum
+
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class TaskBase(BaseModel):
@@ -21,4 +23,23 @@ class Task(TaskBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TaskPage(BaseModel):
+    items: List[Task]
+    next_cursor: Optional[str] = None
+
+
+class TaskSearchHit(Task):
+    snippet: str
+
+
+class TaskSearchPage(BaseModel):
+    items: List[TaskSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
@@ -1,4 +1,9 @@
+from typing import List
+
 from fastapi_users import schemas
+from pydantic import Field
+
+from app.schemas.task import Task
 
 
 class UserRead(schemas.BaseUser[int]):
@@ -10,4 +15,12 @@ class UserCreate(schemas.BaseUserCreate):
 
 
 class UserUpdate(schemas.BaseUserUpdate):
-    pass
\ No newline at end of file
+    pass
+
+
+class UserWithTaskCount(UserRead):
+    task_count: int
+
+
+class UserWithTasks(UserRead):
+    tasks: List[Task] = Field(validation_alias='reservations')
@@ -0,0 +1,284 @@
+import base64
+import csv
+import hashlib
+import io
+import json
+import re
+from datetime import datetime
+from typing import (
+    Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+)
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import fastjson
+from app.core.config import settings
+from app.core.const import (
+    TASKS_EXPORT_CHUNK_SIZE, TASKS_PAGE_LIMIT, TASKS_SEARCH_MAX_TERMS
+)
+from app.core.db import AsyncReadSessionLocal
+from app.crud.task import crud_task, task_list_cache
+from app.models.task import Task
+from app.schemas.task import (
+    ExportFormat, Task as TaskSchema, TaskCreate, TaskPage
+)
+
+EXPORT_FIELDS = ('id', 'name', 'text_of_task', 'user_id', 'created_at', 'close')
+# ORM-объект или строка из колонок: нужны только атрибуты
+TaskLike = Union[Task, Row]
+# Поля и их порядок как в TaskSchema, чтобы оба пути давали один JSON
+TASK_FIELDS = tuple(TaskSchema.model_fields)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class InvalidSearchQuery(ValueError):
+    pass
+
+
+def pack_cursor(values: list) -> str:
+    raw = json.dumps(values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def unpack_cursor(cursor: str) -> list:
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    return json.loads(raw)
+
+
+def encode_cursor(task: TaskLike) -> str:
+    return pack_cursor([task.created_at.isoformat(), task.id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, task_id = unpack_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def encode_search_cursor(hit: Row) -> str:
+    # repr float в JSON точный: следующая страница начнётся ровно после hit
+    return pack_cursor([hit.score, hit.id])
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, task_id = unpack_cursor(cursor)
+        return float(score), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def build_match_query(user_id: int, query: str) -> str:
+    """FTS5-запрос из пользовательской строки.
+
+    Слова берутся как есть, в кавычках: синтаксис FTS5 (OR, NEAR, *, ^)
+    из q не работает. Ищутся целые слова: префиксный запрос FTS5 собирает
+    совпадения по всему индексу до фильтра по owner, на частых словах это
+    секунды. Искать можно только среди своих задач (колонка owner).
+    """
+    terms = re.findall(r'\w+', query)[:TASKS_SEARCH_MAX_TERMS]
+    if not terms:
+        raise InvalidSearchQuery('Search query has no words')
+    phrases = ' '.join(f'"{term}"' for term in terms)
+    return f'owner : "u{user_id}" AND {{name text_of_task}} : ({phrases})'
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Для If-None-Match сравнение слабое: W/ отбрасываем
+    return etag in (
+        tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+    )
+
+
+async def get_user_tasks_page(
+    user_id: int,
+    session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[Sequence[Row], Optional[str]]:
+    after = decode_cursor(cursor) if cursor else None
+    # Лишняя строка показывает, есть ли следующая страница
+    tasks = await crud_task.get_page_rows_by_user_id(
+        user_id=user_id, session=session, limit=limit + 1, after=after
+    )
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        return tasks, encode_cursor(tasks[-1])
+    return tasks, None
+
+
+async def get_user_tasks_view_page(
+    user_id: int,
+    session: AsyncSession,
+    cursor: Optional[str] = None,
+) -> Tuple[List[TaskSchema], Optional[str]]:
+    """Страница задач для HTML-вида, из кэша если есть.
+
+    В кэше лежат страницы по TASKS_PAGE_LIMIT задач, а не весь список:
+    память на пользователя ограничена task_cache_max_pages страницами.
+    """
+    bucket = task_list_cache.bucket(user_id)
+    key = ('view', cursor)
+    cached = task_list_cache.get(bucket, key)
+    if cached is None:
+        tasks, next_cursor = await get_user_tasks_page(
+            user_id=user_id, session=session, limit=TASKS_PAGE_LIMIT,
+            cursor=cursor,
+        )
+        cached = (
+            [TaskSchema.model_validate(task) for task in tasks], next_cursor
+        )
+        task_list_cache.set(user_id, bucket, key, cached)
+    return cached
+
+
+async def search_user_tasks(
+    user_id: int,
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[Sequence[Row], Optional[str]]:
+    match = build_match_query(user_id, query)
+    after = decode_search_cursor(cursor) if cursor else None
+    hits = await crud_task.search_rows(
+        match=match, session=session, limit=limit + 1, after=after
+    )
+    if len(hits) > limit:
+        hits = hits[:limit]
+        return hits, encode_search_cursor(hits[-1])
+    return hits, None
+
+
+async def get_user_tasks_page_json(
+    user_id: int,
+    session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """Готовое JSON-тело страницы и его ETag, из кэша если есть."""
+    bucket = task_list_cache.bucket(user_id)
+    key = ('page', limit, cursor)
+    cached = task_list_cache.get(bucket, key)
+    if cached is None:
+        tasks, next_cursor = await get_user_tasks_page(
+            user_id=user_id, session=session, limit=limit, cursor=cursor
+        )
+        body = render_page_json(
+            tasks, next_cursor, fast=settings.json_fast_path
+        )
+        cached = (body, make_etag(body))
+        task_list_cache.set(user_id, bucket, key, cached)
+    return cached
+
+
+def task_to_dict(task: TaskLike) -> Dict[str, Any]:
+    return {field: getattr(task, field) for field in TASK_FIELDS}
+
+
+def render_page_json(
+    tasks: Sequence[TaskLike], next_cursor: Optional[str], fast: bool
+) -> bytes:
+    if fast:
+        # Строки пришли из БД и уже валидны: без pydantic, сразу в orjson
+        return fastjson.dumps({
+            'items': [task_to_dict(task) for task in tasks],
+            'next_cursor': next_cursor,
+        })
+    page = TaskPage.model_validate(
+        {'items': tasks, 'next_cursor': next_cursor}, from_attributes=True
+    )
+    return page.model_dump_json().encode()
+
+
+def render_ndjson(tasks: Sequence[TaskLike], fast: bool) -> Union[str, bytes]:
+    if fast:
+        return b''.join(
+            fastjson.dumps(task_to_dict(task)) + b'\n' for task in tasks
+        )
+    return ''.join(
+        TaskSchema.model_validate(task).model_dump_json() + '\n'
+        for task in tasks
+    )
+
+
+def render_csv(tasks: Sequence[TaskLike], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for task in tasks:
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in (getattr(task, field) for field in EXPORT_FIELDS)
+        ])
+    return buffer.getvalue()
+
+
+async def export_user_tasks(
+    user_id: int,
+    export_format: ExportFormat,
+) -> AsyncIterator[Union[str, bytes]]:
+    # Своя сессия: генератор дочитывается уже после выхода из эндпоинта
+    async with AsyncReadSessionLocal() as session:
+        result = await crud_task.stream_rows_by_user_id(
+            user_id=user_id,
+            session=session,
+            chunk_size=TASKS_EXPORT_CHUNK_SIZE
+        )
+        if export_format == ExportFormat.csv:
+            yield render_csv([], header=True)
+        async for tasks in result.partitions():
+            if export_format == ExportFormat.csv:
+                yield render_csv(tasks)
+            else:
+                yield render_ndjson(tasks, fast=settings.json_fast_path)
+
+
+async def create_user_task(
+    task_in: TaskCreate,
+    user_id: int,
+    session: AsyncSession,
+) -> Task:
+    # Set created_at to current UTC time
+    created_at = datetime.utcnow()
+
+    if settings.task_write_coalescing:
+        return await crud_task.create_coalesced(
+            task_in=task_in, user_id=user_id, created_at=created_at
+        )
+    return await crud_task.create(
+        task_in=task_in,
+        user_id=user_id,
+        created_at=created_at,
+        session=session
+    )
+
+
+async def create_user_tasks(
+    tasks_in: List[TaskCreate],
+    user_id: int,
+    session: AsyncSession,
+) -> List[Task]:
+    created_at = datetime.utcnow()
+
+    return await crud_task.create_many(
+        tasks_in=tasks_in,
+        user_id=user_id,
+        created_at=created_at,
+        session=session
+    )
@@ -0,0 +1,65 @@
+from typing import Optional
+
+from fastapi import Request
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import exceptions
+from fastapi_users.router.common import ErrorCode
+from pydantic import ValidationError
+
+from app.core.user import UserManager, get_jwt_strategy
+from app.models.user import User
+from app.schemas.user import UserCreate
+
+
+class AuthError(Exception):
+    """Ошибка регистрации или логина, detail как в ответе API."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+async def register_user(
+    email: str,
+    password: str,
+    user_manager: UserManager,
+    request: Optional[Request] = None,
+) -> User:
+    try:
+        user_create = UserCreate(email=email, password=password)
+    except ValidationError as e:
+        raise AuthError(e.errors()[0]['msg'])
+    try:
+        return await user_manager.create(
+            user_create, safe=True, request=request
+        )
+    except exceptions.UserAlreadyExists:
+        raise AuthError(ErrorCode.REGISTER_USER_ALREADY_EXISTS.value)
+    except exceptions.InvalidPasswordException as e:
+        raise AuthError(e.reason)
+
+
+async def login_user(
+    email: str,
+    password: str,
+    user_manager: UserManager,
+    request: Optional[Request] = None,
+) -> str:
+    user = await user_manager.authenticate(
+        OAuth2PasswordRequestForm(username=email, password=password)
+    )
+    if user is None or not user.is_active:
+        raise AuthError(ErrorCode.LOGIN_BAD_CREDENTIALS.value)
+    token = await get_jwt_strategy().write_token(user)
+    await user_manager.on_after_login(user, request)
+    return token
+
+
+async def get_user_by_token(
+    token: str,
+    user_manager: UserManager,
+) -> Optional[User]:
+    user = await get_jwt_strategy().read_token(token, user_manager)
+    if user is None or not user.is_active:
+        return None
+    return user
@@ -0,0 +1,171 @@
+"""Поток фейковых апдейтов Telegram через хендлеры бота.
+
+Запуск: python -m benchmarks.bot_feeder --chats 20 --duration 5
+        --output bot.json
+API поднимается в этом же процессе (uvicorn на свободном порту), бот
+ходит в него настоящим ApiClient. Telegram подменён: ответы бота
+никуда не уходят. Каждый чат логинится, потом по кругу создаёт задачу
+и открывает список. Меряется время обработки апдейта по шагам.
+"""
+import argparse
+import asyncio
+import itertools
+import socket
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import uvicorn
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Chat, Message, Update, User as TelegramUser
+
+from benchmarks.common import (
+    PASSWORD, app, create_schema, percentiles, report, seed, seed_email
+)
+from bot.api import ApiClient
+from bot.handlers.handlers import router
+from bot.outbox import Outbox
+from bot.storage import SQLiteStorage
+
+LOGIN_STEPS = ['/start', 'Логин', None, PASSWORD]
+LOOP_STEPS = ['Создать таск', 'bench task', 'Пропустить', 'Получить таски']
+
+
+class FakeTelegramSession(BaseSession):
+    """Отвечает на любые методы сразу, без сети."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot, method, timeout=None):
+        self.sent += 1
+        chat_id = getattr(method, 'chat_id', None)
+        if chat_id is None:
+            return True
+        return Message(
+            message_id=next(self._message_ids),
+            date=datetime.now(),
+            chat=Chat(id=chat_id, type='private'),
+            text=getattr(method, 'text', None),
+        )
+
+    async def stream_content(self, *args, **kwargs):
+        return
+        yield
+
+    async def close(self) -> None:
+        pass
+
+
+class Updates:
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def message(self, chat_id: int, text: str) -> Update:
+        update_id = next(self._ids)
+        return Update(update_id=update_id, message=Message(
+            message_id=update_id,
+            date=datetime.now(),
+            chat=Chat(id=chat_id, type='private'),
+            from_user=TelegramUser(
+                id=chat_id, is_bot=False, first_name='bench'
+            ),
+            text=text,
+        ))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def feed(dp, bot, updates, chat_id, text, step, samples):
+    started = time.perf_counter()
+    await dp.feed_update(bot, updates.message(chat_id, text))
+    samples.setdefault(step, []).append(time.perf_counter() - started)
+
+
+async def drive_chat(dp, bot, updates, user_id, stop_at, samples):
+    chat_id = 10 ** 6 + user_id
+    for text in LOGIN_STEPS:
+        await feed(
+            dp, bot, updates, chat_id, text or seed_email(user_id),
+            'login', samples,
+        )
+    while time.perf_counter() < stop_at:
+        for text in LOOP_STEPS:
+            await feed(
+                dp, bot, updates, chat_id, text,
+                'list' if text == 'Получить таски' else 'create', samples,
+            )
+
+
+async def main(args) -> None:
+    await create_schema()
+    user_ids = await seed(args.chats, args.tasks)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        app, host='127.0.0.1', port=port, log_level='warning', lifespan='off'
+    ))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    session = FakeTelegramSession()
+    bot = Bot(token='42:bench', session=session)
+    api = ApiClient(
+        base_url=f'http://127.0.0.1:{port}', timeout=30, connect_timeout=5,
+        connections_limit=100, keepalive_timeout=30,
+    )
+    storage = SQLiteStorage(
+        path=f'{tempfile.mkdtemp(prefix="dz-bench-fsm-")}/fsm.db',
+        flush_interval=1, cache_size=10000,
+    )
+    # Лимиты Telegram здесь не нужны: меряем хендлеры, а не очередь
+    outbox = Outbox(
+        bot, global_rate=10 ** 6, chat_rate=10 ** 6, chat_burst=10 ** 6,
+        workers=8,
+    )
+    dp = Dispatcher(storage=storage, api=api, outbox=outbox)
+    dp.include_router(router)
+
+    samples: Dict[str, List[float]] = {}
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            drive_chat(
+                dp, bot, Updates(), user_id, started + args.duration, samples
+            )
+            for user_id in user_ids
+        ))
+        elapsed = time.perf_counter() - started
+        await outbox.close()
+    finally:
+        await storage.close()
+        await api.close()
+        server.should_exit = True
+        await serving
+
+    total = sum(len(step) for step in samples.values())
+    report({
+        'chats': args.chats,
+        'tasks_per_user': args.tasks,
+        'duration': args.duration,
+        'updates_per_s': round(total / elapsed, 1),
+        'replies_sent': session.sent,
+        'steps': {step: percentiles(values) for step, values in samples.items()},
+    }, args.output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chats', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--output', help='куда сохранить результат в JSON')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""Общие части бенчмарков: временная БД, наполнение, клиент, перцентили."""
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks.sandbox import use_scratch_database
+
+use_scratch_database('bench')
+
+import httpx  # noqa: E402
+
+from app.core.db import Base, engine  # noqa: E402
+from app.core.user import get_jwt_strategy  # noqa: E402
+from app.models import User  # noqa: E402
+from benchmarks import data  # noqa: E402
+from benchmarks.data import PASSWORD, seed_email  # noqa: E402,F401
+from main import app  # noqa: E402
+
+
+async def create_schema() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def make_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://bench'
+    )
+
+
+async def register_and_login(client: httpx.AsyncClient, email: str) -> str:
+    await client.post(
+        '/auth/register', json={'email': email, 'password': PASSWORD}
+    )
+    response = await client.post(
+        '/auth/jwt/login', data={'username': email, 'password': PASSWORD}
+    )
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+async def seed(users: int, tasks_per_user: int) -> List[int]:
+    return await data.seed(engine, users, tasks_per_user)
+
+
+async def issue_token(user_id: int) -> str:
+    # Токен без похода в /auth/jwt/login и без хеширования пароля
+    return await get_jwt_strategy().write_token(User(id=user_id))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(result: Dict[str, Any], output: Optional[str]) -> None:
+    """Печатает результат и, если задан output, сохраняет его в JSON."""
+    result = {'revision': git_revision(), 'argv': sys.argv[1:], **result}
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        'count': len(ordered),
+        'p50_ms': round(pick(0.50) * 1000, 3),
+        'p95_ms': round(pick(0.95) * 1000, 3),
+        'p99_ms': round(pick(0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
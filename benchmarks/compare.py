@@ -0,0 +1,42 @@
+"""Сравнение двух JSON-отчётов бенчмарков (например, до и после коммита).
+
+Запуск: python -m benchmarks.compare before.json after.json
+Печатает метрики, которые есть в обоих отчётах, и изменение в процентах.
+"""
+import argparse
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'updates_per_s')
+
+
+def flatten(node: Any, path: str = '') -> Iterator[Tuple[str, float]]:
+    if not isinstance(node, dict):
+        return
+    for key, value in node.items():
+        name = f'{path}.{key}' if path else key
+        if key in METRICS and isinstance(value, (int, float)):
+            yield name, value
+        else:
+            yield from flatten(value, name)
+
+
+def main(args) -> None:
+    with open(args.before, encoding='utf-8') as file:
+        before: Dict[str, float] = dict(flatten(json.load(file)))
+    with open(args.after, encoding='utf-8') as file:
+        after: Dict[str, float] = dict(flatten(json.load(file)))
+    width = max((len(name) for name in before), default=0)
+    for name, old in before.items():
+        if name not in after:
+            continue
+        new = after[name]
+        change = f'{(new - old) / old * 100:+.1f}%' if old else 'n/a'
+        print(f'{name:<{width}}  {old:>10}  {new:>10}  {change:>8}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    main(parser.parse_args())
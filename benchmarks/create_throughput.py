@@ -0,0 +1,63 @@
+"""Пропускная способность POST /tasks/ с group commit и без.
+
+Запуск: python -m benchmarks.create_throughput --duration 3 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import (
+    create_schema, make_client, percentiles, register_and_login
+)
+from app.core.config import settings  # noqa: E402
+
+
+async def create_forever(client, headers, stop_at, samples):
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        response = await client.post(
+            '/tasks/', json={'name': 'bench'}, headers=headers
+        )
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+
+async def run_phase(client, headers, duration, concurrency):
+    samples = []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(
+        create_forever(client, headers, stop_at, samples)
+        for _ in range(concurrency)
+    ))
+    return {
+        **percentiles(samples),
+        'creates_per_s': round(len(samples) / duration, 1),
+    }
+
+
+async def main(args) -> None:
+    await create_schema()
+    result = {}
+    async with make_client() as client:
+        token = await register_and_login(client, 'writer@example.com')
+        headers = {'Authorization': f'Bearer {token}'}
+        for coalescing in (False, True):
+            settings.task_write_coalescing = coalescing
+            mode = 'coalesced' if coalescing else 'per_request_commit'
+            result[mode] = {
+                str(concurrency): await run_phase(
+                    client, headers, args.duration, concurrency
+                )
+                for concurrency in args.concurrency
+            }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=3)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 8, 32, 64]
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,54 @@
+"""Пользователи и задачи для бенчмарков и тестов, прямо в таблицы."""
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.password import password_helper
+from app.models import Task, User
+
+PASSWORD = 'bench-password'
+
+
+def seed_email(user_id: int) -> str:
+    return f'user{user_id}@example.com'
+
+
+async def seed(
+    engine: AsyncEngine,
+    users: int,
+    tasks_per_user: int,
+    superusers: int = 0,
+    chunk: int = 5000,
+) -> List[int]:
+    """Пользователи с паролем PASSWORD и по tasks_per_user задач у каждого.
+
+    Первые superusers пользователей — суперпользователи. Хеш пароля
+    считается один раз на всех.
+    """
+    hashed_password = password_helper.hash(PASSWORD)
+    user_ids = list(range(1, users + 1))
+    now = datetime.utcnow()
+    async with engine.begin() as conn:
+        await conn.execute(insert(User.__table__), [
+            {
+                'id': user_id, 'email': seed_email(user_id),
+                'hashed_password': hashed_password, 'is_active': True,
+                'is_superuser': user_id <= superusers, 'is_verified': False,
+            }
+            for user_id in user_ids
+        ])
+        rows = [
+            {
+                'name': f'task {i}',
+                'text_of_task': 'text ' * 10 if i % 2 else None,
+                'user_id': user_id,
+                'created_at': now - timedelta(seconds=i),
+            }
+            for user_id in user_ids
+            for i in range(tasks_per_user)
+        ]
+        for start in range(0, len(rows), chunk):
+            await conn.execute(insert(Task.__table__), rows[start:start + chunk])
+    return user_ids
@@ -0,0 +1,62 @@
+"""Кодирование страницы задач: pydantic-путь против быстрого (orjson).
+
+Запуск: python -m benchmarks.json_encoding --sizes 10 1000 50000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentiles
+from app.models import Task
+from app.services.task import render_page_json
+
+
+def make_tasks(count: int):
+    now = datetime.utcnow()
+    return [
+        Task(
+            id=i,
+            name=f'task {i}',
+            text_of_task='text ' * 10 if i % 2 else None,
+            user_id=1,
+            created_at=now - timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def measure(tasks, fast: bool, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render_page_json(tasks, 'cursor', fast=fast)
+        samples.append(time.perf_counter() - started)
+    return {**percentiles(samples), 'bytes': len(body)}
+
+
+def main(args) -> None:
+    result = {}
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        # Оба пути обязаны давать одинаковый JSON
+        assert json.loads(render_page_json(tasks, None, fast=True)) == \
+            json.loads(render_page_json(tasks, None, fast=False))
+        repeat = max(3, args.rows // size)
+        result[str(size)] = {
+            'pydantic': measure(tasks, fast=False, repeat=repeat),
+            'orjson': measure(tasks, fast=True, repeat=repeat),
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10, 1000, 50000]
+    )
+    parser.add_argument(
+        '--rows', type=int, default=200000,
+        help='сколько строк закодировать на каждый размер'
+    )
+    main(parser.parse_args())
@@ -0,0 +1,149 @@
+"""Нагрузочный прогон API и HTML-страниц на временной SQLite.
+
+Запуск: python -m benchmarks.load --users 100 --tasks 200 --concurrency 16
+        --duration 5 --output before.json
+Сценарии по очереди: register, login, list, create, page_login, page_tasks.
+Для каждого — запросы в секунду, ошибки и p50/p95/p99.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.common import (
+    PASSWORD, create_schema, issue_token, make_client, percentiles, report,
+    seed, seed_email
+)
+
+
+class LoadContext:
+    def __init__(self, tokens: Dict[int, str]):
+        self.tokens = tokens
+        self.user_ids = list(tokens)
+        self.emails = itertools.count()
+
+    def user(self) -> Tuple[int, str]:
+        user_id = random.choice(self.user_ids)
+        return user_id, self.tokens[user_id]
+
+
+Scenario = Callable[[httpx.AsyncClient, LoadContext], Awaitable[httpx.Response]]
+SCENARIOS: Dict[str, Tuple[Scenario, int]] = {}
+
+
+def scenario(name: str, expected_status: int):
+    def register(func: Scenario) -> Scenario:
+        SCENARIOS[name] = (func, expected_status)
+        return func
+    return register
+
+
+@scenario('register', 201)
+async def register(client, ctx):
+    return await client.post('/auth/register', json={
+        'email': f'load{next(ctx.emails)}@example.com', 'password': PASSWORD
+    })
+
+
+@scenario('login', 200)
+async def login(client, ctx):
+    user_id, _ = ctx.user()
+    return await client.post('/auth/jwt/login', data={
+        'username': seed_email(user_id), 'password': PASSWORD
+    })
+
+
+@scenario('list', 200)
+async def list_tasks(client, ctx):
+    _, token = ctx.user()
+    return await client.get(
+        '/tasks/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+
+@scenario('create', 201)
+async def create(client, ctx):
+    _, token = ctx.user()
+    return await client.post(
+        '/tasks/', json={'name': 'load'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+
+@scenario('page_login', 200)
+async def page_login(client, ctx):
+    return await client.get('/login')
+
+
+@scenario('page_tasks', 200)
+async def page_tasks(client, ctx):
+    _, token = ctx.user()
+    return await client.get(
+        '/tasks', headers={'Cookie': f'access_token={token}'}
+    )
+
+
+async def worker(client, func, expected_status, ctx, stop_at, samples, errors):
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        response = await func(client, ctx)
+        samples.append(time.perf_counter() - started)
+        if response.status_code != expected_status:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+
+async def run_scenario(client, name, ctx, duration, concurrency):
+    func, expected_status = SCENARIOS[name]
+    samples: List[float] = []
+    errors: Dict[int, int] = {}
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*(
+        worker(client, func, expected_status, ctx, stop_at, samples, errors)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        **percentiles(samples),
+        'rps': round(len(samples) / elapsed, 1),
+        'errors': {str(status): count for status, count in errors.items()},
+    }
+
+
+async def main(args) -> None:
+    await create_schema()
+    user_ids = await seed(args.users, args.tasks)
+    ctx = LoadContext({
+        user_id: await issue_token(user_id) for user_id in user_ids
+    })
+    result = {}
+    async with make_client() as client:
+        for name in args.scenarios:
+            result[name] = await run_scenario(
+                client, name, ctx, args.duration, args.concurrency
+            )
+    report({
+        'users': args.users,
+        'tasks_per_user': args.tasks,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'scenarios': result,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument(
+        '--scenarios', nargs='+', choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+    )
+    parser.add_argument('--output', help='куда сохранить результат в JSON')
+    asyncio.run(main(parser.parse_args()))
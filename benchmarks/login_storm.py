@@ -0,0 +1,89 @@
+"""p99 GET /tasks/ до и во время шторма логинов.
+
+Запуск: python -m benchmarks.login_storm --duration 5 --logins 16
+С --inline-hashing хеширование идёт прямо в event loop, как раньше.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import Executor, Future
+from typing import List
+
+from benchmarks.common import (
+    PASSWORD, create_schema, make_client, percentiles, register_and_login
+)
+from app.core import password  # noqa: E402
+
+
+class InlineExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+async def read_tasks(client, token: str, stop_at: float, samples: List[float]):
+    headers = {'Authorization': f'Bearer {token}'}
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        response = await client.get('/tasks/', headers=headers)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+        # Отдаём управление, чтобы читатели не занимали цикл целиком
+        await asyncio.sleep(0.001)
+
+
+async def login_forever(client, email: str, stop_at: float, done: List[int]):
+    while time.perf_counter() < stop_at:
+        response = await client.post(
+            '/auth/jwt/login', data={'username': email, 'password': PASSWORD}
+        )
+        response.raise_for_status()
+        done[0] += 1
+
+
+async def run_phase(client, token, email, duration, readers, logins):
+    samples: List[float] = []
+    done = [0]
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(
+        *(read_tasks(client, token, stop_at, samples) for _ in range(readers)),
+        *(login_forever(client, email, stop_at, done) for _ in range(logins)),
+    )
+    return {**percentiles(samples), 'logins': done[0]}
+
+
+async def main(args) -> None:
+    if args.inline_hashing:
+        password._executor = InlineExecutor()
+    await create_schema()
+    async with make_client() as client:
+        token = await register_and_login(client, 'reader@example.com')
+        await client.post(
+            '/tasks/bulk',
+            json=[{'name': f'task {i}'} for i in range(args.tasks)],
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        await register_and_login(client, 'storm@example.com')
+        result = {
+            'baseline': await run_phase(
+                client, token, 'storm@example.com', args.duration,
+                args.readers, 0
+            ),
+            'login_storm': await run_phase(
+                client, token, 'storm@example.com', args.duration,
+                args.readers, args.logins
+            ),
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--logins', type=int, default=16)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--inline-hashing', action='store_true')
+    asyncio.run(main(parser.parse_args()))
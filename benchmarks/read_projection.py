@@ -0,0 +1,73 @@
+"""Чтение списка задач: ORM-сущности против строк из колонок.
+
+Запуск: python -m benchmarks.read_projection --sizes 1000 50000
+Меряет время выборки и пик памяти (tracemalloc) для обоих путей
+и сколько объектов осталось в identity map сессии.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from sqlalchemy import desc, select
+
+from benchmarks.common import create_schema, percentiles, seed
+from app.core.db import AsyncSessionLocal
+from app.crud.task import crud_task
+from app.models import Task
+
+
+async def read_entities(user_id: int, session) -> list:
+    # Тот же запрос, что у get_all_rows_by_user_id, но целыми сущностями
+    result = await session.execute(
+        select(Task).where(Task.user_id == user_id)
+        .order_by(desc(Task.created_at), desc(Task.id))
+    )
+    return result.scalars().all()
+
+
+async def measure(user_id: int, rows: bool, repeat: int):
+    read = crud_task.get_all_rows_by_user_id if rows else read_entities
+    samples = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as session:
+            started = time.perf_counter()
+            await read(user_id=user_id, session=session)
+            samples.append(time.perf_counter() - started)
+    async with AsyncSessionLocal() as session:
+        tracemalloc.start()
+        result = await read(user_id=user_id, session=session)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        identity_map = len(session.identity_map)
+    return {
+        **percentiles(samples),
+        'rows': len(result),
+        'peak_kib': round(peak / 1024),
+        'identity_map': identity_map,
+    }
+
+
+async def main(args) -> None:
+    result = {}
+    for size in args.sizes:
+        # Своя база на размер: один пользователь с size задачами
+        await create_schema()
+        [user_id] = await seed(users=1, tasks_per_user=size)
+        repeat = max(3, args.rows // size)
+        result[str(size)] = {
+            'orm': await measure(user_id, rows=False, repeat=repeat),
+            'rows': await measure(user_id, rows=True, repeat=repeat),
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 50000])
+    parser.add_argument(
+        '--rows', type=int, default=200000,
+        help='сколько строк прочитать на каждый размер'
+    )
+    asyncio.run(main(parser.parse_args()))
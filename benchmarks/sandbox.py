@@ -0,0 +1,18 @@
+"""Временная БД для бенчмарков и тестов; импортируется до app."""
+import os
+import tempfile
+
+
+def use_scratch_database(name: str) -> str:
+    """Направляет app во временную базу и возвращает её каталог.
+
+    Вызывать до импорта app: Settings читается при импорте. Присваиваем,
+    а не setdefault: бенчмарки делают drop_all, и база из окружения или
+    .env не должна сюда попасть. Пустой DATABASE_READ_URL перекрывает .env.
+    """
+    tmpdir = tempfile.mkdtemp(prefix=f'dz-{name}-')
+    os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{tmpdir}/{name}.db'
+    os.environ['DATABASE_READ_URL'] = ''
+    os.environ['SECRET'] = f'{name}-secret'
+    os.environ['BOT_TOCKN'] = f'0:{name}'
+    return tmpdir
@@ -7,21 +7,98 @@ from aiogram.utils.token import TokenValidationError
 from dotenv import load_dotenv
 
 from app.core.config import settings
+from app.core.log import setup_logging, stop_logging
 
 
+from bot.api import ApiClient
 from bot.handlers.handlers import router
+from bot.outbox import Outbox
+from bot.scheduler import ChatScheduler
+from bot.stats import log_stats
+from bot.storage import SQLiteStorage
+from bot.webhook import run_webhook
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
+BOT_MODES = ('polling', 'webhook')
+
+
+def check_settings() -> None:
+    # До запуска чего-либо: иначе ошибка всплывёт только внутри set_webhook
+    if settings.bot_mode not in BOT_MODES:
+        raise SystemExit(
+            f'Unknown BOT_MODE={settings.bot_mode!r}, '
+            f'expected one of: {", ".join(BOT_MODES)}'
+        )
+    if settings.bot_mode == 'webhook' and not settings.bot_webhook_url:
+        raise SystemExit('BOT_WEBHOOK_URL is required when BOT_MODE=webhook')
+
+
 async def main() -> None:
+    check_settings()
+    setup_logging(settings.log_level, settings.log_sample_rates)
     bot = Bot(token=settings.bot_tockn)
-    dp = Dispatcher()
+    api = ApiClient(
+        base_url=settings.api_base_url,
+        timeout=settings.bot_api_timeout,
+        connect_timeout=settings.bot_api_connect_timeout,
+        connections_limit=settings.bot_api_connections_limit,
+        keepalive_timeout=settings.bot_api_keepalive_timeout,
+    )
+    storage = SQLiteStorage(
+        path=settings.bot_fsm_db_path,
+        flush_interval=settings.bot_fsm_flush_interval,
+        cache_size=settings.bot_fsm_cache_size,
+    )
+    outbox = Outbox(
+        bot,
+        global_rate=settings.bot_send_global_rate,
+        chat_rate=settings.bot_send_chat_rate,
+        chat_burst=settings.bot_send_chat_burst,
+        workers=settings.bot_send_workers,
+    )
+    # api и outbox попадают в хендлеры через DI aiogram
+    dp = Dispatcher(storage=storage, api=api, outbox=outbox)
     dp.include_routers(router)
-    await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    stats_sources = {'outbox': outbox.stats}
+    if settings.bot_mode == 'polling':
+        # При webhook порядок апдейтов чата держит UpdateQueue
+        scheduler = ChatScheduler(settings.bot_max_concurrent_updates)
+        dp.message.outer_middleware(scheduler)
+        dp.callback_query.outer_middleware(scheduler)
+        stats_sources['scheduler'] = scheduler.stats
+    stats_task = None
+    if settings.bot_stats_interval > 0:
+        stats_task = asyncio.create_task(
+            log_stats(stats_sources, settings.bot_stats_interval)
+        )
+    try:
+        if settings.bot_mode == 'webhook':
+            await run_webhook(
+                dp, bot,
+                url=settings.bot_webhook_url,
+                path=settings.bot_webhook_path,
+                host=settings.bot_webhook_host,
+                port=settings.bot_webhook_port,
+                secret=settings.bot_webhook_secret,
+                max_concurrency=settings.bot_webhook_max_concurrency,
+                backlog=settings.bot_webhook_backlog,
+                stats_sources=stats_sources,
+            )
+        else:
+            await bot.delete_webhook(drop_pending_updates=True)
+            await dp.start_polling(bot)
+    finally:
+        if stats_task is not None:
+            stats_task.cancel()
+        await outbox.close()
+        await storage.close()
+        await api.close()
+        await bot.session.close()
+        stop_logging()
 
 
 asyncio.run(main())
\ No newline at end of file
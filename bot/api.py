@@ -0,0 +1,131 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import aiohttp
+
+
+@dataclass
+class ApiResponse:
+    status: int
+    data: Any
+    body: bytes
+
+    @property
+    def text(self) -> str:
+        # Декодируем только когда тело действительно нужно
+        return self.body.decode('utf-8', errors='replace')
+
+    @property
+    def detail(self) -> str:
+        if isinstance(self.data, dict):
+            return str(self.data.get('detail', 'Unknown error'))
+        return f'Server returned non-JSON response: {self.text}'
+
+
+class ApiClient:
+    """Один пул соединений к API на всё время жизни бота."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        connect_timeout: float,
+        connections_limit: int,
+        keepalive_timeout: float,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(
+            total=timeout, connect=connect_timeout
+        )
+        self.connections_limit = connections_limit
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(
+                    limit=self.connections_limit,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300,
+                ),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method: str, url: str, **kwargs) -> ApiResponse:
+        try:
+            async with self.session.request(
+                method, self.base_url + url, **kwargs
+            ) as response:
+                body = await response.read()
+                try:
+                    data = json.loads(body)
+                except ValueError:
+                    data = None
+                return ApiResponse(
+                    status=response.status, data=data, body=body
+                )
+        except asyncio.TimeoutError as e:
+            # Хендлеры ловят только aiohttp.ClientError
+            raise aiohttp.ServerTimeoutError(
+                f'{method} {url} timed out'
+            ) from e
+
+    @staticmethod
+    def auth_headers(token: str) -> dict:
+        return {'Authorization': f'Bearer {token}'}
+
+    async def register(self, email: str, password: str) -> ApiResponse:
+        return await self.request(
+            'POST',
+            '/auth/register',
+            json={
+                'email': email,
+                'password': password,
+                'is_active': True,
+                'is_superuser': False,
+                'is_verified': False
+            }
+        )
+
+    async def login(self, email: str, password: str) -> ApiResponse:
+        return await self.request(
+            'POST',
+            '/auth/jwt/login',
+            data={
+                'username': email,
+                'password': password
+            }
+        )
+
+    async def get_tasks(
+        self, token: str, limit: int, cursor: Optional[str] = None
+    ) -> ApiResponse:
+        params = {'limit': limit}
+        if cursor is not None:
+            params['cursor'] = cursor
+        return await self.request(
+            'GET', '/tasks/', params=params, headers=self.auth_headers(token)
+        )
+
+    async def create_task(
+        self, token: str, name: str, text_of_task: Optional[str]
+    ) -> ApiResponse:
+        return await self.request(
+            'POST',
+            '/tasks/',
+            json={
+                'name': name,
+                'text_of_task': text_of_task
+            },
+            headers=self.auth_headers(token)
+        )
@@ -1,13 +1,25 @@
 from datetime import datetime
 from aiogram import Router, F, types
 from aiogram.filters import CommandStart
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import (
+    InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+)
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from typing import Optional, Tuple
 import aiohttp
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from app.core.config import settings
+from app.core.const import (
+    BOT_TASK_NAME_PREVIEW, BOT_TASK_TEXT_PREVIEW, BOT_TASKS_PAGE_SIZE,
+    TELEGRAM_MESSAGE_LIMIT
+)
+from app.core.log import truncate
+from bot.api import ApiClient
+from bot.outbox import BULK, Outbox
+
 logger = logging.getLogger(__name__)
 
 router = Router()
@@ -24,6 +36,17 @@ class TaskCreationStates(StatesGroup):
     waiting_for_name = State()
     waiting_for_text = State()
 
+# Учётные данные не должны оставаться в FSM: хранилище пишет data на диск
+CREDENTIAL_KEYS = ('email', 'password')
+
+async def forget_credentials(state: FSMContext) -> None:
+    user_data = await state.get_data()
+    if any(key in user_data for key in CREDENTIAL_KEYS):
+        await state.set_data({
+            key: value for key, value in user_data.items()
+            if key not in CREDENTIAL_KEYS
+        })
+
 # Create keyboards for main menu
 def get_main_menu(is_authenticated: bool = False) -> ReplyKeyboardMarkup:
     if is_authenticated:
@@ -55,312 +78,340 @@ def get_skip_keyboard() -> ReplyKeyboardMarkup:
 
 # Start command handler
 @router.message(CommandStart())
-async def command_start(message: types.Message, state: FSMContext) -> None:
+async def command_start(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     user_data = await state.get_data()
     is_authenticated = 'access_token' in user_data
-    logger.info(f"Start command: is_authenticated={is_authenticated}, user_data={user_data}")
-    await message.answer(
+    logger.info("Start command: is_authenticated=%s", is_authenticated)
+    outbox.send(message.answer(
         'Hi! What do you want?',
         reply_markup=get_main_menu(is_authenticated),
-    )
+    ))
     if not is_authenticated:
         await state.clear()
 
 # Registration button handler
 @router.message(F.text == 'Зарегистрироваться')
-async def start_registration(message: types.Message, state: FSMContext) -> None:
+async def start_registration(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     user_data = await state.get_data()
     if 'access_token' in user_data:
-        await message.answer(
+        outbox.send(message.answer(
             "You are already registered and logged in!",
             reply_markup=get_main_menu(is_authenticated=True)
-        )
+        ))
         return
-    await message.answer(
+    outbox.send(message.answer(
         "Please enter your email:",
         reply_markup=types.ReplyKeyboardRemove()
-    )
+    ))
     await state.set_state(RegistrationStates.waiting_for_email)
 
 # Handle email input for registration
 @router.message(RegistrationStates.waiting_for_email)
-async def process_email(message: types.Message, state: FSMContext) -> None:
+async def process_email(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     if '@' not in message.text:
-        await message.answer("Please enter a valid email address:")
+        outbox.send(message.answer("Please enter a valid email address:"))
         return
     await state.update_data(email=message.text)
-    await message.answer("Please enter your password:")
+    outbox.send(message.answer("Please enter your password:"))
     await state.set_state(RegistrationStates.waiting_for_password)
 
 # Handle password input for registration
 @router.message(RegistrationStates.waiting_for_password)
-async def process_password(message: types.Message, state: FSMContext) -> None:
-    await state.update_data(password=message.text)
+async def process_password(message: types.Message, state: FSMContext, api: ApiClient, outbox: Outbox) -> None:
     user_data = await state.get_data()
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(
-                'http://localhost:8000/auth/register',
-                json={
-                    'email': user_data['email'],
-                    'password': user_data['password'],
-                    'is_active': True,
-                    'is_superuser': False,
-                    'is_verified': False
-                }
-            ) as response:
-                logger.info(f"Register response: {response.status} {await response.text()}")
-                if response.status == 201:
-                    response_data = await response.json()
-                    token = response_data.get('access_token')
-                    if token:
-                        await state.update_data(access_token=token)
-                        logger.info(f"Stored token: {token}")
-                    await message.answer(
-                        f"Registration successful!\nEmail: {user_data['email']}",
-                        reply_markup=get_main_menu(is_authenticated=True)
-                    )
-                else:
-                    try:
-                        error_data = await response.json()
-                        await message.answer(
-                            f"Registration failed: {error_data.get('detail', 'Unknown error')}",
-                            reply_markup=get_main_menu()
-                        )
-                    except aiohttp.ContentTypeError:
-                        error_text = await response.text()
-                        await message.answer(
-                            f"Registration failed: Server returned non-JSON response: {error_text}",
-                            reply_markup=get_main_menu()
-                        )
-        except aiohttp.ClientError as e:
-            logger.error(f"Register error: {str(e)}")
-            await message.answer(
-                f"Error connecting to server: {str(e)}",
+    try:
+        response = await api.register(user_data['email'], message.text)
+        logger.info("Register response: %s", response.status)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Register response body: %s", truncate(response.text))
+        if response.status == 201:
+            token = response.data.get('access_token')
+            if token:
+                await state.update_data(access_token=token)
+                logger.info("Stored token for chat %s", message.chat.id)
+            outbox.send(message.answer(
+                f"Registration successful!\nEmail: {user_data['email']}",
+                reply_markup=get_main_menu(is_authenticated=True)
+            ))
+        else:
+            outbox.send(message.answer(
+                f"Registration failed: {response.detail}",
                 reply_markup=get_main_menu()
-            )
+            ))
+    except aiohttp.ClientError as e:
+        logger.error("Register error: %s", e)
+        outbox.send(message.answer(
+            f"Error connecting to server: {str(e)}",
+            reply_markup=get_main_menu()
+        ))
+    await forget_credentials(state)
     await state.set_state(None)
 
 # Login button handler
 @router.message(F.text == 'Логин')
-async def start_login(message: types.Message, state: FSMContext) -> None:
+async def start_login(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     user_data = await state.get_data()
     if 'access_token' in user_data:
-        await message.answer(
+        outbox.send(message.answer(
             "You are already logged in!",
             reply_markup=get_main_menu(is_authenticated=True)
-        )
+        ))
         return
-    await message.answer(
+    outbox.send(message.answer(
         "Please enter your email:",
         reply_markup=types.ReplyKeyboardRemove()
-    )
+    ))
     await state.set_state(LoginStates.waiting_for_email)
 
 # Handle login email input
 @router.message(LoginStates.waiting_for_email)
-async def process_login_email(message: types.Message, state: FSMContext) -> None:
+async def process_login_email(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     if '@' not in message.text:
-        await message.answer("Please enter a valid email address:")
+        outbox.send(message.answer("Please enter a valid email address:"))
         return
     await state.update_data(email=message.text)
-    await message.answer("Please enter your password:")
+    outbox.send(message.answer("Please enter your password:"))
     await state.set_state(LoginStates.waiting_for_password)
 
 # Handle login password input
 @router.message(LoginStates.waiting_for_password)
-async def process_login_password(message: types.Message, state: FSMContext) -> None:
+async def process_login_password(message: types.Message, state: FSMContext, api: ApiClient, outbox: Outbox) -> None:
     user_data = await state.get_data()
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(
-                'http://localhost:8000/auth/jwt/login',
-                data={
-                    'username': user_data['email'],
-                    'password': message.text
-                },
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            ) as response:
-                logger.info(f"Login response: {response.status} {await response.text()}")
-                if response.status == 200:
-                    response_data = await response.json()
-                    token = response_data.get('access_token')
-                    if token:
-                        await state.update_data(access_token=token)
-                        logger.info(f"Stored token: {token}")
-                    await message.answer(
-                        f"Login successful!\nEmail: {user_data['email']}\nYou can now get your tasks!",
-                        reply_markup=get_main_menu(is_authenticated=True)
-                    )
-                else:
-                    try:
-                        error_data = await response.json()
-                        await message.answer(
-                            f"Login failed: {error_data.get('detail', 'Unknown error')}",
-                            reply_markup=get_main_menu()
-                        )
-                    except aiohttp.ContentTypeError:
-                        error_text = await response.text()
-                        await message.answer(
-                            f"Login failed: Server returned non-JSON response: {error_text}",
-                            reply_markup=get_main_menu()
-                        )
-        except aiohttp.ClientError as e:
-            logger.error(f"Login error: {str(e)}")
-            await message.answer(
-                f"Error connecting to server: {str(e)}",
+    try:
+        response = await api.login(user_data['email'], message.text)
+        logger.info("Login response: %s", response.status)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Login response body: %s", truncate(response.text))
+        if response.status == 200:
+            token = response.data.get('access_token')
+            if token:
+                await state.update_data(access_token=token)
+                logger.info("Stored token for chat %s", message.chat.id)
+            outbox.send(message.answer(
+                f"Login successful!\nEmail: {user_data['email']}\nYou can now get your tasks!",
+                reply_markup=get_main_menu(is_authenticated=True)
+            ))
+        else:
+            outbox.send(message.answer(
+                f"Login failed: {response.detail}",
                 reply_markup=get_main_menu()
-            )
+            ))
+    except aiohttp.ClientError as e:
+        logger.error("Login error: %s", e)
+        outbox.send(message.answer(
+            f"Error connecting to server: {str(e)}",
+            reply_markup=get_main_menu()
+        ))
+    await forget_credentials(state)
     await state.set_state(None)
 
 # Logout handler
 @router.message(F.text == 'Выйти')
-async def logout(message: types.Message, state: FSMContext) -> None:
+async def logout(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     await state.clear()
-    await message.answer(
+    outbox.send(message.answer(
         "You have been logged out.",
         reply_markup=get_main_menu(is_authenticated=False)
+    ))
+
+class TasksPage(CallbackData, prefix='tasks'):
+    page: int
+
+
+def shorten(text: Optional[str], limit: int) -> Optional[str]:
+    if text and len(text) > limit:
+        return text[:limit - 1] + '…'
+    return text
+
+
+def format_task(number: int, task: dict) -> str:
+    name = shorten(task['name'], BOT_TASK_NAME_PREVIEW)
+    text = shorten(task.get('text_of_task'), BOT_TASK_TEXT_PREVIEW)
+    return f"Task {number}:\nname: {name}\ntext: {text}\ncreated_at: {task['created_at']}"
+
+
+def get_tasks_keyboard(page: int, has_next: bool) -> Optional[InlineKeyboardMarkup]:
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(
+            text='« Назад', callback_data=TasksPage(page=page - 1).pack()
+        ))
+    if has_next:
+        buttons.append(InlineKeyboardButton(
+            text='Вперёд »', callback_data=TasksPage(page=page + 1).pack()
+        ))
+    return InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+
+
+async def fetch_tasks_page(
+    state: FSMContext, api: ApiClient, page: int
+) -> Tuple[Optional[str], Optional[InlineKeyboardMarkup]]:
+    """Загружает одну страницу; None вместо текста — сессия истекла.
+
+    Курсоры уже открытых страниц хранятся в FSM, поэтому «Назад»
+    и «Вперёд» — это один запрос к API на нажатие.
+    """
+    user_data = await state.get_data()
+    cursors = user_data.get('task_cursors', [None])
+    response = await api.get_tasks(
+        user_data['access_token'], limit=BOT_TASKS_PAGE_SIZE, cursor=cursors[page]
+    )
+    logger.info("Get tasks response: %s", response.status)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Get tasks response body: %s", truncate(response.text))
+    if response.status == 401:
+        await state.clear()
+        return None, None
+    if response.status != 200:
+        return f"Failed to fetch tasks: {response.detail}", None
+    tasks = response.data['items']
+    next_cursor = response.data['next_cursor']
+    if not tasks:
+        return "You have no tasks.", None
+    await state.update_data(task_cursors=cursors[:page + 1] + [next_cursor])
+    first = page * BOT_TASKS_PAGE_SIZE + 1
+    tasks_list = "\n".join(
+        format_task(first + i, task) for i, task in enumerate(tasks)
     )
+    # Длиннее лимита Telegram не примет сообщение, и ответа не будет вовсе
+    return (
+        shorten(
+            f"Your tasks (page {page + 1}):\n{tasks_list}",
+            TELEGRAM_MESSAGE_LIMIT,
+        ),
+        get_tasks_keyboard(page, next_cursor is not None),
+    )
+
 
 # Handle "Get Tasks" button
 @router.message(F.text == 'Получить таски')
-async def get_tasks(message: types.Message, state: FSMContext) -> None:
+async def get_tasks(message: types.Message, state: FSMContext, api: ApiClient, outbox: Outbox) -> None:
     user_data = await state.get_data()
     if 'access_token' not in user_data:
-        await message.answer(
+        outbox.send(message.answer(
             "Please log in or register first!",
             reply_markup=get_main_menu(is_authenticated=False)
-        )
+        ))
         return
-    logger.info(f"Get tasks with token: {user_data['access_token']}")
-
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(
-                'http://localhost:8000/tasks/',
-                headers={'Authorization': f'Bearer {user_data["access_token"]}'}
-            ) as response:
-                logger.info(f"Get tasks response: {response.status} {await response.text()}")
-                if response.status == 200:
-                    tasks = await response.json()
-                    if tasks:
-                        tasks_list = "\n".join([
-                            f"Task {i + 1}:\nname: {task['name']}\ntext: {task.get('text_of_task', 'None')}\ncreated_at: {task['created_at']}"
-                            for i, task in enumerate(tasks)
-                        ])
-                        await message.answer(
-                            f"Your tasks:\n{tasks_list}",
-                            reply_markup=get_main_menu(is_authenticated=True)
-                        )
-                    else:
-                        await message.answer(
-                            "You have no tasks.",
-                            reply_markup=get_main_menu(is_authenticated=True)
-                        )
-                elif response.status == 401:
-                    await state.clear()
-                    await message.answer(
-                        "Your session has expired. Please log in again.",
-                        reply_markup=get_main_menu(is_authenticated=False)
-                    )
-                else:
-                    try:
-                        error_data = await response.json()
-                        await message.answer(
-                            f"Failed to fetch tasks: {error_data.get('detail', 'Unknown error')}",
-                            reply_markup=get_main_menu(is_authenticated=True)
-                        )
-                    except aiohttp.ContentTypeError:
-                        error_text = await response.text()
-                        await message.answer(
-                            f"Failed to fetch tasks: Server returned non-JSON response: {error_text}",
-                            reply_markup=get_main_menu(is_authenticated=True)
-                        )
-        except aiohttp.ClientError as e:
-            logger.error(f"Get tasks error: {str(e)}")
-            await message.answer(
-                f"Error connecting to server: {str(e)}",
-                reply_markup=get_main_menu(is_authenticated=True)
-            )
+
+    try:
+        await state.update_data(task_cursors=[None])
+        text, keyboard = await fetch_tasks_page(state, api, page=0)
+        if text is None:
+            outbox.send(message.answer(
+                "Your session has expired. Please log in again.",
+                reply_markup=get_main_menu(is_authenticated=False)
+            ))
+            return
+        # Длинный список уступает коротким ответам других чатов
+        outbox.send(message.answer(
+            text,
+            reply_markup=keyboard or get_main_menu(is_authenticated=True)
+        ), priority=BULK)
+    except aiohttp.ClientError as e:
+        logger.error("Get tasks error: %s", e)
+        outbox.send(message.answer(
+            f"Error connecting to server: {str(e)}",
+            reply_markup=get_main_menu(is_authenticated=True)
+        ))
+
+# Handle "next/prev" buttons under the task list
+@router.callback_query(TasksPage.filter())
+async def turn_tasks_page(
+    callback: types.CallbackQuery, callback_data: TasksPage,
+    state: FSMContext, api: ApiClient, outbox: Outbox
+) -> None:
+    user_data = await state.get_data()
+    if 'access_token' not in user_data:
+        await callback.answer("Please log in or register first!", show_alert=True)
+        return
+    if callback_data.page >= len(user_data.get('task_cursors', [None])):
+        await callback.answer("This list is outdated, request it again.", show_alert=True)
+        return
+
+    try:
+        text, keyboard = await fetch_tasks_page(state, api, callback_data.page)
+    except aiohttp.ClientError as e:
+        logger.error("Get tasks error: %s", e)
+        await callback.answer(f"Error connecting to server: {str(e)}", show_alert=True)
+        return
+    await callback.answer()
+    if text is None:
+        outbox.send(callback.message.answer(
+            "Your session has expired. Please log in again.",
+            reply_markup=get_main_menu(is_authenticated=False)
+        ))
+        return
+    outbox.send(
+        callback.message.edit_text(text, reply_markup=keyboard), priority=BULK
+    )
 
 # Handle "Create Task" button
 @router.message(F.text == 'Создать таск')
-async def start_task_creation(message: types.Message, state: FSMContext) -> None:
+async def start_task_creation(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     user_data = await state.get_data()
     if 'access_token' not in user_data:
-        await message.answer(
+        outbox.send(message.answer(
             "Please log in or register first!",
             reply_markup=get_main_menu(is_authenticated=False)
-        )
+        ))
         return
-    await message.answer(
+    outbox.send(message.answer(
         "Please enter the task name:",
         reply_markup=types.ReplyKeyboardRemove()
-    )
+    ))
     await state.set_state(TaskCreationStates.waiting_for_name)
 
 # Handle task name input
 @router.message(TaskCreationStates.waiting_for_name)
-async def process_task_name(message: types.Message, state: FSMContext) -> None:
+async def process_task_name(message: types.Message, state: FSMContext, outbox: Outbox) -> None:
     if not message.text.strip():
-        await message.answer("Task name cannot be empty. Please enter a valid name:")
+        outbox.send(message.answer("Task name cannot be empty. Please enter a valid name:"))
         return
     await state.update_data(task_name=message.text.strip())
-    await message.answer(
+    outbox.send(message.answer(
         "Please enter the task description (or press 'Пропустить' to leave it empty):",
         reply_markup=get_skip_keyboard()
-    )
+    ))
     await state.set_state(TaskCreationStates.waiting_for_text)
 
 # Handle task text input or skip
 @router.message(TaskCreationStates.waiting_for_text)
-async def process_task_text(message: types.Message, state: FSMContext) -> None:
+async def process_task_text(message: types.Message, state: FSMContext, api: ApiClient, outbox: Outbox) -> None:
     user_data = await state.get_data()
     task_text = None if message.text == 'Пропустить' else message.text.strip()
-    logger.info(f"Creating task with token: {user_data['access_token']}, name: {user_data['task_name']}, text: {task_text}")
-
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(
-                'http://localhost:8000/tasks/',
-                json={
-                    'name': user_data['task_name'],
-                    'text_of_task': task_text
-                },
-                headers={'Authorization': f'Bearer {user_data["access_token"]}'}
-            ) as response:
-                logger.info(f"Create task response: {response.status} {await response.text()}")
-                if response.status == 201:
-                    response_data = await response.json()
-                    await message.answer(
-                        f"Task created successfully!\nname: {response_data['name']}\ntext: {response_data.get('text_of_task', 'None')}\ncreated_at: {response_data['created_at']}",
-                        reply_markup=get_main_menu(is_authenticated=True)
-                    )
-                elif response.status == 401:
-                    await state.clear()
-                    await message.answer(
-                        "Your session has expired. Please log in again.",
-                        reply_markup=get_main_menu(is_authenticated=False)
-                    )
-                else:
-                    try:
-                        error_data = await response.json()
-                        await message.answer(
-                            f"Failed to create task: {error_data.get('detail', 'Unknown error')}",
-                            reply_markup=get_main_menu(is_authenticated=True)
-                        )
-                    except aiohttp.ContentTypeError:
-                        error_text = await response.text()
-                        await message.answer(
-                            f"Failed to create task: Server returned non-JSON response: {error_text}",
-                            reply_markup=get_main_menu(is_authenticated=True)
-                        )
-        except aiohttp.ClientError as e:
-            logger.error(f"Create task error: {str(e)}")
-            await message.answer(
-                f"Error connecting to server: {str(e)}",
+    logger.info("Creating task for chat %s", message.chat.id)
+
+    try:
+        response = await api.create_task(
+            user_data['access_token'], user_data['task_name'], task_text
+        )
+        logger.info("Create task response: %s", response.status)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Create task response body: %s", truncate(response.text))
+        if response.status == 201:
+            response_data = response.data
+            outbox.send(message.answer(
+                f"Task created successfully!\nname: {response_data['name']}\ntext: {response_data.get('text_of_task', 'None')}\ncreated_at: {response_data['created_at']}",
                 reply_markup=get_main_menu(is_authenticated=True)
-            )
-    await state.set_state(None)  # Clear only task creation state, keep access_token
\ No newline at end of file
+            ))
+        elif response.status == 401:
+            await state.clear()
+            outbox.send(message.answer(
+                "Your session has expired. Please log in again.",
+                reply_markup=get_main_menu(is_authenticated=False)
+            ))
+        else:
+            outbox.send(message.answer(
+                f"Failed to create task: {response.detail}",
+                reply_markup=get_main_menu(is_authenticated=True)
+            ))
+    except aiohttp.ClientError as e:
+        logger.error("Create task error: %s", e)
+        outbox.send(message.answer(
+            f"Error connecting to server: {str(e)}",
+            reply_markup=get_main_menu(is_authenticated=True)
+        ))
+    await state.set_state(None)  # Clear only task creation state, keep access_token
@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+
+from app.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BULK = 10
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Сколько ждать до следующего токена, 0 — можно сейчас."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+@dataclass
+class Outgoing:
+    priority: int
+    seq: int
+    method: TelegramMethod
+    future: asyncio.Future
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Ошибка уже залогирована, ждать результат отправитель не обязан
+    if not future.cancelled():
+        future.exception()
+
+
+class Outbox:
+    """Очередь исходящих запросов к Telegram с ограничением скорости.
+
+    send() не ждёт отправки: хендлер сразу возвращается, а воркеры шлют
+    с максимально разрешённой скоростью — не чаще chat_rate в секунду
+    на чат (с запасом chat_burst) и global_rate на бота. Внутри чата
+    порядок сохраняется, между чатами первыми идут INTERACTIVE.
+    На RetryAfter отправка встаёт на паузу и запрос повторяется.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: int,
+        workers: int,
+    ):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.workers = workers
+        self.retries = 0
+        # Глобально без запаса: лимит Telegram считается по секундам
+        self._global = TokenBucket(global_rate, 1)
+        # Через burst / rate секунд простоя ведро снова полное, его можно забыть
+        self._buckets = LRUCache(maxsize=100000, ttl=chat_burst / chat_rate)
+        self._chats: Dict[Any, Deque[Outgoing]] = {}
+        self._scheduled = set()
+        self._ready: List[Tuple[int, int, Any]] = []
+        self._has_ready = asyncio.Event()
+        self._seq = itertools.count()
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._paused_until = 0.0
+        self._tasks: List[asyncio.Task] = []
+
+    def send(
+        self, method: TelegramMethod, priority: int = INTERACTIVE
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._work()) for _ in range(self.workers)
+            ]
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        chat_id = getattr(method, 'chat_id', None)
+        self._chats.setdefault(chat_id, deque()).append(
+            Outgoing(priority, next(self._seq), method, future)
+        )
+        self._pending += 1
+        self._idle.clear()
+        if chat_id not in self._scheduled:
+            self._scheduled.add(chat_id)
+            self._schedule(chat_id)
+        return future
+
+    def _bucket(self, chat_id: Any) -> Optional[TokenBucket]:
+        if chat_id is None:
+            return None
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+        # set продлевает TTL, пока чат активен
+        self._buckets.set(chat_id, bucket)
+        return bucket
+
+    def _schedule(self, chat_id: Any, not_before: float = 0.0) -> None:
+        bucket = self._bucket(chat_id)
+        delay = max(not_before, bucket.delay() if bucket else 0.0)
+        if delay > 0:
+            asyncio.get_running_loop().call_later(
+                delay, self._schedule, chat_id
+            )
+            return
+        if bucket is not None:
+            bucket.take()
+        head = self._chats[chat_id][0]
+        heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+        self._has_ready.set()
+
+    async def _take_global(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = max(self._paused_until - loop.time(), self._global.delay())
+            if delay <= 0:
+                self._global.take()
+                return
+            await asyncio.sleep(delay)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            while not self._ready:
+                self._has_ready.clear()
+                await self._has_ready.wait()
+            _, _, chat_id = heapq.heappop(self._ready)
+            await self._take_global()
+            queue = self._chats[chat_id]
+            item = queue.popleft()
+            try:
+                result = await self.bot(item.method)
+            except TelegramRetryAfter as e:
+                self.retries += 1
+                logger.warning(
+                    'Flood limit hit, retrying in %s s', e.retry_after
+                )
+                queue.appendleft(item)
+                self._paused_until = max(
+                    self._paused_until, loop.time() + e.retry_after
+                )
+                self._schedule(chat_id, not_before=e.retry_after)
+                continue
+            except Exception as e:
+                logger.warning(
+                    '%s failed: %s', type(item.method).__name__, e
+                )
+                item.future.set_exception(e)
+            else:
+                item.future.set_result(result)
+            self._pending -= 1
+            if not self._pending:
+                self._idle.set()
+            if queue:
+                self._schedule(chat_id)
+            else:
+                del self._chats[chat_id]
+                self._scheduled.discard(chat_id)
+
+    async def close(self, timeout: float = 10) -> None:
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning('Outbox closed with %d unsent requests', self._pending)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'pending': self._pending,
+            'chats': len(self._chats),
+            'ready': len(self._ready),
+            'retries': self.retries,
+        }
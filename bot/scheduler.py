@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from bot.stats import deepest
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+
+class ChatScheduler(BaseMiddleware):
+    """Апдейты одного чата — строго по очереди, разных чатов — параллельно.
+
+    Всего одновременно выполняется не больше max_concurrency хендлеров.
+    Слот берётся только после очереди своего чата, так что один
+    «шумный» чат не занимает слоты, пока ждёт сам себя. Ожидание идёт
+    в задаче апдейта, которую polling создаёт на каждый апдейт. Только
+    для polling: при webhook порядок и параллелизм держит UpdateQueue.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.max_depth = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._depth: Dict[int, int] = {}
+
+    async def __call__(
+        self,
+        handler: Handler,
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get('event_chat')
+        if chat is None:
+            return await self._run(handler, event, data)
+        chat_id = chat.id
+        # asyncio.Lock будит ожидающих в порядке прихода
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        depth = self._depth.get(chat_id, 0) + 1
+        self._depth[chat_id] = depth
+        self.max_depth = max(self.max_depth, depth)
+        try:
+            async with lock:
+                state = data.get('state')
+                if state is not None:
+                    # Состояние могло поменяться, пока апдейт ждал очереди
+                    data['raw_state'] = await state.get_state()
+                return await self._run(handler, event, data)
+        finally:
+            depth = self._depth[chat_id] - 1
+            if depth:
+                self._depth[chat_id] = depth
+            else:
+                del self._depth[chat_id]
+                del self._locks[chat_id]
+
+    async def _run(
+        self,
+        handler: Handler,
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self._slots:
+            self.active += 1
+            try:
+                return await handler(event, data)
+            finally:
+                self.active -= 1
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            'active': self.active,
+            'limit': self.max_concurrency,
+            'queued': max(sum(self._depth.values()) - self.active, 0),
+            'chats': len(self._depth),
+            'max_depth': self.max_depth,
+            'deepest': deepest(self._depth.items(), top),
+        }
@@ -0,0 +1,28 @@
+"""Периодическая запись в лог очередей бота: планировщик, outbox, webhook."""
+import asyncio
+import heapq
+import logging
+from operator import itemgetter
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+StatsSource = Callable[[], Dict[str, Any]]
+
+
+def deepest(
+    depths: Iterable[Tuple[Hashable, int]], top: int
+) -> Dict[str, int]:
+    """top самых длинных очередей чатов: ключ чата -> число апдейтов."""
+    return {
+        str(key): depth
+        for key, depth in heapq.nlargest(top, depths, key=itemgetter(1))
+    }
+
+
+async def log_stats(sources: Dict[str, StatsSource], interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        # Источники могут добавиться после старта (очередь webhook)
+        for name, stats in list(sources.items()):
+            logger.info('%s stats: %s', name, stats())
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Set
+
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StorageRecord:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def make_key(key: StorageKey) -> str:
+    return ':'.join(str(part) for part in (
+        key.bot_id, key.chat_id, key.user_id, key.thread_id,
+        key.business_connection_id, key.destiny,
+    ))
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM в локальном SQLite: чтение через кэш, запись пачками раз в interval.
+
+    Изменения за последние flush_interval секунд теряются при падении
+    процесса, но не при штатной остановке (close дописывает всё).
+    """
+
+    def __init__(self, path: str, flush_interval: float, cache_size: int):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, StorageRecord]' = OrderedDict()
+        self._dirty: Set[str] = set()
+        # Ключи, которые сейчас пишутся: до commit их нельзя вытеснять
+        self._flushing: Set[str] = set()
+        self._flush_lock = asyncio.Lock()
+        self._db: Optional[aiosqlite.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def _connect(self) -> aiosqlite.Connection:
+        async with self._db_lock:
+            if self._db is None:
+                db = await aiosqlite.connect(self.path)
+                await db.execute('PRAGMA journal_mode=WAL')
+                await db.execute('PRAGMA synchronous=NORMAL')
+                await db.execute(
+                    'CREATE TABLE IF NOT EXISTS fsm ('
+                    'key TEXT PRIMARY KEY, state TEXT, data TEXT NOT NULL)'
+                )
+                await db.commit()
+                self._db = db
+        return self._db
+
+    async def _record(self, key: StorageKey) -> StorageRecord:
+        storage_key = make_key(key)
+        record = self._cache.get(storage_key)
+        if record is None:
+            db = await self._connect()
+            async with db.execute(
+                'SELECT state, data FROM fsm WHERE key = ?', (storage_key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            loaded = (
+                StorageRecord(state=row[0], data=json.loads(row[1]))
+                if row else StorageRecord()
+            )
+            # Пока ждали БД, запись могла появиться в кэше
+            record = self._cache.setdefault(storage_key, loaded)
+            self._evict(keep=storage_key)
+        self._cache.move_to_end(storage_key)
+        return record
+
+    def _evict(self, keep: str) -> None:
+        # Вытесняем только уже записанные в БД записи
+        for storage_key in list(self._cache):
+            if len(self._cache) <= self.cache_size:
+                break
+            if (
+                storage_key != keep
+                and storage_key not in self._dirty
+                and storage_key not in self._flushing
+            ):
+                del self._cache[storage_key]
+
+    def _mark_dirty(self, key: StorageKey) -> None:
+        self._dirty.add(make_key(key))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Ключи вернулись в _dirty, повторим через interval
+                logger.exception('FSM storage flush failed')
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            self._flushing = dirty
+            try:
+                upserts, deletes = [], []
+                for storage_key in dirty:
+                    record = self._cache[storage_key]
+                    if record.state is None and not record.data:
+                        deletes.append((storage_key,))
+                    else:
+                        upserts.append((
+                            storage_key, record.state, json.dumps(record.data)
+                        ))
+                db = await self._connect()
+                if upserts:
+                    await db.executemany(
+                        'INSERT INTO fsm (key, state, data) VALUES (?, ?, ?) '
+                        'ON CONFLICT(key) DO UPDATE SET '
+                        'state = excluded.state, data = excluded.data',
+                        upserts,
+                    )
+                if deletes:
+                    await db.executemany(
+                        'DELETE FROM fsm WHERE key = ?', deletes
+                    )
+                await db.commit()
+            except BaseException:
+                # Записи остались в кэше: запишем их в следующий раз
+                self._dirty |= dirty
+                raise
+            finally:
+                self._flushing = set()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._record(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        record = await self._record(key)
+        record.data = dict(data)
+        self._mark_dirty(key)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._record(key)).data.copy()
+
+    async def close(self) -> None:
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+        if self._dirty:
+            await self.flush()
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
@@ -0,0 +1,187 @@
+import asyncio
+import hmac
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from bot.stats import deepest
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+# Апдейты, у которых есть чат; для callback_query чат берётся из message
+CHAT_UPDATES = (
+    'message', 'edited_message', 'channel_post', 'edited_channel_post',
+    'business_message', 'edited_business_message',
+)
+
+
+def chat_key(update: Dict[str, Any]) -> Hashable:
+    """Чат апдейта, как event_chat в aiogram; без чата — свой ключ."""
+    try:
+        for name in CHAT_UPDATES:
+            if name in update:
+                return update[name]['chat']['id']
+        message = update.get('callback_query', {}).get('message')
+        if message is not None:
+            return message['chat']['id']
+    except (KeyError, TypeError, AttributeError):
+        pass
+    return ('update', update.get('update_id'))
+
+
+class UpdateQueue:
+    """Очереди апдейтов по чатам и фиксированное число обработчиков.
+
+    Обработчик берёт следующий готовый чат и выполняет один его апдейт,
+    после чего чат встаёт в конец очереди готовых. Так апдейты чата идут
+    по порядку, а «шумный» чат держит не больше одного обработчика и не
+    задерживает остальные. Если принято backlog апдейтов, новый не
+    принимается: Telegram получит 503 и сам пришлёт его позже, память
+    при всплеске не растёт. В webhook-режиме это единственный слой
+    порядка и параллелизма: ChatScheduler подключается только к polling.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_concurrency: int,
+        backlog: int,
+    ):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.max_concurrency = max_concurrency
+        self.backlog = backlog
+        self.rejected = 0
+        self.max_depth = 0
+        self._pending = 0
+        # Чат есть в _chats, пока он в _ready или его апдейт выполняется
+        self._chats: Dict[Hashable, Deque[Dict[str, Any]]] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._ready = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._work())
+            for _ in range(self.max_concurrency)
+        ]
+
+    def put_nowait(self, update: Dict[str, Any]) -> bool:
+        if self._pending >= self.backlog:
+            self.rejected += 1
+            return False
+        key = chat_key(update)
+        updates = self._chats.get(key)
+        if updates is None:
+            updates = self._chats[key] = deque()
+            self._ready.put_nowait(key)
+        updates.append(update)
+        self._pending += 1
+        self.max_depth = max(self.max_depth, len(updates))
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            key = await self._ready.get()
+            updates = self._chats[key]
+            update = updates.popleft()
+            try:
+                await self.dispatcher.feed_raw_update(self.bot, update)
+            except Exception:
+                logger.exception(
+                    'Update %s failed', update.get('update_id')
+                )
+            finally:
+                self._pending -= 1
+                if updates:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                self._ready.task_done()
+
+    async def close(self) -> None:
+        if self._ready is None:
+            return
+        # Дорабатываем уже принятые апдейты
+        await self._ready.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            'queued': self._pending,
+            'backlog': self.backlog,
+            'workers': len(self._workers),
+            'chats': len(self._chats),
+            'max_depth': self.max_depth,
+            'deepest': deepest(
+                ((key, len(updates)) for key, updates in self._chats.items()),
+                top,
+            ),
+            'rejected': self.rejected,
+        }
+
+
+def make_app(
+    updates: UpdateQueue, path: str, secret: Optional[str]
+) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        if secret is not None and not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ''), secret
+        ):
+            return web.Response(status=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not updates.put_nowait(update):
+            logger.warning('Webhook backlog is full, update rejected')
+            return web.Response(status=503)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(path, handle)
+    return app
+
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    url: str,
+    path: str,
+    host: str,
+    port: int,
+    secret: Optional[str],
+    max_concurrency: int,
+    backlog: int,
+    stats_sources: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None,
+) -> None:
+    updates = UpdateQueue(dispatcher, bot, max_concurrency, backlog)
+    if stats_sources is not None:
+        stats_sources['webhook'] = updates.stats
+    runner = web.AppRunner(make_app(updates, path, secret))
+    await runner.setup()
+    updates.start()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        await bot.set_webhook(
+            url=url.rstrip('/') + path,
+            secret_token=secret,
+            max_connections=min(max_concurrency, 100),
+            allowed_updates=dispatcher.resolve_used_update_types(),
+        )
+        logger.info('Webhook is listening on %s:%s%s', host, port, path)
+        await asyncio.Event().wait()
+    finally:
+        # Сначала перестаём принимать, потом дорабатываем очередь
+        await runner.cleanup()
+        await updates.close()
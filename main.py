@@ -1,9 +1,44 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.core import fastjson, query_log
 from app.core.config import settings
+from app.core.db import engine, read_engine
+from app.core.log import setup_logging, stop_logging
+from app.core.metrics import MetricsMiddleware, metrics
 from app.api.routers import main_router
+from app.crud.task import task_write_coalescer
 from app.view.user import router as auth_view_router
 
-app = FastAPI(title=settings.app_title)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging(settings.log_level, settings.log_sample_rates)
+    yield
+    # Дописываем накопленные вставки до остановки
+    await task_write_coalescer.close()
+    stop_logging()
+
+
+app = FastAPI(
+    title=settings.app_title,
+    lifespan=lifespan,
+    default_response_class=fastjson.response_class(),
+)
 app.include_router(main_router)
-app.include_router(auth_view_router)
\ No newline at end of file
+app.include_router(auth_view_router)
+
+metrics.enabled = settings.metrics_enabled
+metrics.attach_engine('write', engine, settings.slow_query_ms)
+if read_engine is not None:
+    metrics.attach_engine('read', read_engine, settings.slow_query_ms)
+query_guard = None
+if settings.query_guard != 'off':
+    query_guard = query_log.QueryGuard(
+        budget=settings.query_budget,
+        repeat_limit=settings.query_repeat_limit,
+        raise_errors=settings.query_guard == 'raise',
+    )
+if settings.metrics_enabled or query_guard is not None:
+    app.add_middleware(MetricsMiddleware, metrics=metrics, guard=query_guard)
@@ -0,0 +1,65 @@
+import os
+
+from benchmarks.sandbox import use_scratch_database
+
+use_scratch_database('tests')
+# N+1 и перерасход запросов в тестах — ошибка, а не строка в логе
+os.environ['QUERY_GUARD'] = 'raise'
+
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.db import Base  # noqa: E402
+from app.core.metrics import Metrics  # noqa: E402
+from app.models import Task, User  # noqa: E402,F401
+
+
+class Statements(list):
+    """(statement, parameters) в порядке выполнения."""
+
+    def of(self, verb: str) -> list:
+        return [
+            item for item in self
+            if item[0].lstrip().upper().startswith(verb)
+        ]
+
+
+@pytest.fixture(scope='session')
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def engine():
+    """Пустая схема в SQLite в памяти; StaticPool — одно соединение на всех."""
+    test_engine = create_async_engine(
+        'sqlite+aiosqlite://', poolclass=StaticPool
+    )
+    # Хук как у движков приложения: guard запроса видит и тестовую базу
+    Metrics().attach_engine('tests', test_engine, settings.slow_query_ms)
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield test_engine
+    await test_engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    """Запросы к engine, выполненные после подключения фикстуры."""
+    recorded = Statements()
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        recorded.append((statement, parameters))
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    yield recorded
+    event.remove(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
@@ -0,0 +1,22 @@
+"""Пачка задач пишется одним INSERT, строки возвращаются в порядке пачки."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.task import crud_task
+from app.schemas.task import TaskCreate
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_many_is_one_insert_in_order(engine, statements):
+    names = [f'task {i}' for i in range(20)]
+    async with AsyncSession(engine) as session:
+        rows = await crud_task.create_many(
+            tasks_in=[TaskCreate(name=name) for name in names],
+            user_id=1, created_at=datetime.utcnow(), session=session,
+        )
+    assert len(statements.of('INSERT')) == 1
+    assert [row.name for row in rows] == names
+    assert [row.id for row in rows] == sorted(row.id for row in rows)
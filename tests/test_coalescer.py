@@ -0,0 +1,62 @@
+"""Group commit: пачка — один INSERT, каждый вызов получает свою строку."""
+import asyncio
+
+import pytest
+
+from app.core.coalescer import InsertCoalescer
+from app.models import Task
+
+pytestmark = pytest.mark.anyio
+
+NAMES = [f'task {i}' for i in range(20)]
+
+
+def make_coalescer(engine, **kwargs) -> InsertCoalescer:
+    return InsertCoalescer(
+        Task.__table__, engine, max_delay=0.05, max_batch=len(NAMES),
+        **kwargs,
+    )
+
+
+async def submit_all(coalescer: InsertCoalescer) -> list:
+    # Ошибка воркера должна дойти до вызова, а не оставить его ждать
+    return await asyncio.wait_for(asyncio.gather(*(
+        coalescer.submit({'name': name}) for name in NAMES
+    )), timeout=5)
+
+
+async def test_batch_is_one_insert_and_rows_match_callers(engine, statements):
+    coalescer = make_coalescer(engine)
+    rows = await submit_all(coalescer)
+    await coalescer.close()
+    assert len(statements.of('INSERT')) == 1
+    assert [row.name for row in rows] == NAMES
+
+
+async def test_failed_on_commit_still_returns_rows(engine):
+    def on_commit(rows):
+        raise RuntimeError('cache is down')
+
+    coalescer = make_coalescer(engine, on_commit=on_commit)
+    rows = await submit_all(coalescer)
+    await coalescer.close()
+    assert [row.name for row in rows] == NAMES
+
+
+async def test_worker_error_fails_the_batch_and_worker_survives(
+    engine, monkeypatch
+):
+    coalescer = make_coalescer(engine)
+
+    async def broken_flush(batch):
+        raise RuntimeError('flush is broken')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(coalescer, '_flush', broken_flush)
+        results = await asyncio.wait_for(asyncio.gather(*(
+            coalescer.submit({'name': name}) for name in NAMES
+        ), return_exceptions=True), timeout=5)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    rows = await submit_all(coalescer)
+    await coalescer.close()
+    assert [row.name for row in rows] == NAMES
@@ -0,0 +1,80 @@
+"""Outbox: ведро токенов, приоритеты между чатами и повтор после RetryAfter."""
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from bot import outbox as outbox_module
+from bot.outbox import BULK, INTERACTIVE, Outbox, TokenBucket
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeBot:
+    """Записывает отправленное; retry_after — сколько раз ответить RetryAfter."""
+
+    def __init__(self, retry_after: int = 0):
+        self.sent = []
+        self.retry_after = retry_after
+
+    async def __call__(self, method):
+        if self.retry_after:
+            self.retry_after -= 1
+            error = TelegramRetryAfter(method, 'Flood control', retry_after=1)
+            # Секунда Telegram в тесте — слишком долго
+            error.retry_after = 0.05
+            raise error
+        self.sent.append((method.chat_id, method.text))
+        return True
+
+
+def message(chat_id: int, text: str) -> SendMessage:
+    return SendMessage(chat_id=chat_id, text=text)
+
+
+def make_outbox(bot: FakeBot, workers: int = 1) -> Outbox:
+    return Outbox(
+        bot, global_rate=1000, chat_rate=1000, chat_burst=1000,
+        workers=workers,
+    )
+
+
+def test_bucket_allows_burst_then_waits_for_rate(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(outbox_module.time, 'monotonic', lambda: now[0])
+    bucket = TokenBucket(rate=2, capacity=2)
+    for _ in range(2):
+        assert bucket.delay() == 0
+        bucket.take()
+    assert bucket.delay() == pytest.approx(0.5)
+    now[0] += 0.25
+    assert bucket.delay() == pytest.approx(0.25)
+    now[0] += 0.25
+    assert bucket.delay() == 0
+
+
+async def test_interactive_goes_before_bulk_across_chats():
+    bot = FakeBot()
+    outbox = make_outbox(bot)
+    outbox.send(message(1, 'list'), priority=BULK)
+    outbox.send(message(2, 'hi'), priority=INTERACTIVE)
+    outbox.send(message(3, 'list'), priority=BULK)
+    outbox.send(message(4, 'hi'))
+    await outbox.close()
+    assert [chat_id for chat_id, _ in bot.sent] == [2, 4, 1, 3]
+
+
+async def test_retry_after_pauses_and_keeps_chat_order():
+    bot = FakeBot(retry_after=1)
+    outbox = make_outbox(bot, workers=2)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first = outbox.send(message(1, 'first'))
+    second = outbox.send(message(1, 'second'))
+    assert await asyncio.wait_for(first, timeout=5) is True
+    await asyncio.wait_for(second, timeout=5)
+    await outbox.close()
+    assert loop.time() - started >= 0.05
+    assert bot.sent == [(1, 'first'), (1, 'second')]
+    assert outbox.stats()['retries'] == 1
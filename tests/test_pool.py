@@ -0,0 +1,31 @@
+"""Телеметрия пула: успешные выдачи и таймауты считаются отдельно."""
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.pool import InstrumentedAsyncPool, pool_stats
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_timeout_is_not_a_checkout(tmp_path):
+    engine = create_async_engine(
+        f'sqlite+aiosqlite:///{tmp_path}/pool.db',
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    try:
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        async with engine.connect():
+            pass
+        stats = pool_stats(engine)
+    finally:
+        await engine.dispose()
+    assert stats['checkouts'] == 2
+    assert stats['timeouts'] == 1
+    # Первое соединение открывалось, второе ждало только очередь;
+    # таймаут в ожидание не попал
+    assert stats['wait_max_ms'] < 50
@@ -0,0 +1,103 @@
+"""Число SQL-запросов на горячих эндпоинтах.
+
+Каждый эндпоинт вызывается на маленьком и на большом наборе данных:
+число запросов должно совпасть с EXPECTED и не зависеть от объёма.
+Иначе появился N+1 или лишняя загрузка связи.
+"""
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import get_async_read_session, get_async_session
+from app.core.user import get_jwt_strategy, user_cache
+from app.crud.task import task_list_cache
+from app.models import User
+from benchmarks.data import PASSWORD, seed, seed_email
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+# (пользователей, задач у каждого); пользователь 1 — суперпользователь
+DATASETS = ((3, 2), (30, 40))
+EXPECTED = {
+    'login': 1,
+    'list_tasks': 2,
+    'create_task': 2,
+    'create_bulk': 2,
+    'admin_users': 2,
+    'admin_user': 3,
+    'page_tasks': 2,
+    'search_tasks': 2,
+}
+
+
+@pytest.fixture(
+    params=DATASETS, ids=lambda dataset: '{}x{}'.format(*dataset)
+)
+async def client(request, engine):
+    session_factory = sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def get_session():
+        async with session_factory() as session:
+            yield session
+
+    await seed(engine, *request.param, superusers=1)
+    app.dependency_overrides[get_async_session] = get_session
+    app.dependency_overrides[get_async_read_session] = get_session
+    try:
+        async with httpx.AsyncClient(
+            # Ошибка эндпоинта — 500 у него, а не исключение из транспорта
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url='http://check',
+        ) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        app.dependency_overrides.pop(get_async_read_session, None)
+
+
+async def request(client: httpx.AsyncClient, name: str, headers: dict):
+    if name == 'login':
+        return await client.post('/auth/jwt/login', data={
+            'username': seed_email(2), 'password': PASSWORD
+        })
+    if name == 'list_tasks':
+        return await client.get('/tasks/', headers=headers)
+    if name == 'create_task':
+        return await client.post(
+            '/tasks/', json={'name': 'new'}, headers=headers
+        )
+    if name == 'create_bulk':
+        return await client.post(
+            '/tasks/bulk', json=[{'name': 'new'}] * 10, headers=headers
+        )
+    if name == 'admin_users':
+        return await client.get('/admin/users', headers=headers)
+    if name == 'admin_user':
+        return await client.get('/admin/users/2', headers=headers)
+    if name == 'search_tasks':
+        return await client.get('/tasks/search?q=task', headers=headers)
+    if name == 'page_tasks':
+        token = headers['Authorization'].split()[1]
+        return await client.get(
+            '/tasks', headers={'Cookie': f'access_token={token}'}
+        )
+    raise ValueError(name)
+
+
+@pytest.mark.parametrize('name', EXPECTED)
+async def test_query_count_is_fixed(client, statements, name):
+    user_id = 1 if name.startswith('admin') else 2
+    token = await get_jwt_strategy().write_token(User(id=user_id))
+    # Кеши общие для всех тестов — без сброса считали бы попадания
+    user_cache.clear()
+    task_list_cache.clear()
+    statements.clear()
+    response = await request(
+        client, name, {'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code < 400, response.text
+    assert len(statements) == EXPECTED[name]
@@ -0,0 +1,47 @@
+"""Guard запросов: N+1 и перерасход бюджета в режиме raise."""
+import logging
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import watch_queries
+from app.core.query_log import QueryBudgetExceeded, QueryGuard
+from app.models import Task, User
+
+pytestmark = pytest.mark.anyio
+
+
+async def load_users_one_by_one(session: AsyncSession, count: int) -> None:
+    for user_id in range(count):
+        await session.execute(select(User).where(User.id == user_id))
+
+
+async def test_repeated_statement_raises_before_it_runs(engine, statements):
+    guard = QueryGuard(budget=30, repeat_limit=3, raise_errors=True)
+    async with AsyncSession(engine) as session:
+        with watch_queries('n+1', guard) as stats:
+            with pytest.raises(QueryBudgetExceeded, match='likely N[+]1'):
+                await load_users_one_by_one(session, 10)
+    assert stats.queries == 4
+    # Четвёртый остановлен хуком guard, до курсора и до записи в statements
+    assert len(statements.of('SELECT')) == 3
+
+
+async def test_budget_raises_on_distinct_statements(engine):
+    guard = QueryGuard(budget=1, repeat_limit=5, raise_errors=True)
+    async with AsyncSession(engine) as session:
+        with watch_queries('budget', guard):
+            await session.execute(select(User))
+            with pytest.raises(QueryBudgetExceeded, match='more than 1'):
+                await session.execute(select(Task))
+
+
+async def test_warn_mode_only_logs(engine, caplog):
+    guard = QueryGuard(budget=30, repeat_limit=3, raise_errors=False)
+    async with AsyncSession(engine) as session:
+        with watch_queries('warn', guard) as stats:
+            with caplog.at_level(logging.WARNING, 'app.core.query_log'):
+                await load_users_one_by_one(session, 10)
+    assert stats.queries == 10
+    assert 'likely N+1' in caplog.text
@@ -0,0 +1,53 @@
+"""Планы горячих запросов CRUD: без SCAN и без временного B-дерева."""
+from datetime import datetime
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.task import crud_task
+
+pytestmark = pytest.mark.anyio
+
+BAD_PLAN_STEPS = ('SCAN ', 'USE TEMP B-TREE')
+AFTER = (datetime(2026, 1, 1), 1)
+
+HOT_QUERIES = {
+    'get_by_id': lambda session: crud_task.get_by_id(
+        user_id=1, session=session
+    ),
+    'get_all_rows_by_user_id': lambda session: crud_task.get_all_rows_by_user_id(
+        user_id=1, session=session
+    ),
+    'get_page_rows_by_user_id': lambda session: crud_task.get_page_rows_by_user_id(
+        user_id=1, session=session, limit=51
+    ),
+    'get_page_rows_by_user_id_after': lambda session: crud_task.get_page_rows_by_user_id(
+        user_id=1, session=session, limit=51, after=AFTER
+    ),
+}
+
+
+async def query_plans(
+    engine, statements, run_query
+) -> List[Tuple[str, List[str]]]:
+    async with AsyncSession(engine) as session:
+        await run_query(session)
+        captured = statements.of('SELECT')
+        conn = await session.connection()
+        plans = []
+        for statement, parameters in captured:
+            rows = await conn.exec_driver_sql(
+                'EXPLAIN QUERY PLAN ' + statement, parameters
+            )
+            plans.append((statement, [row[-1] for row in rows]))
+    return plans
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+async def test_hot_query_uses_index(engine, statements, name):
+    plans = await query_plans(engine, statements, HOT_QUERIES[name])
+    assert plans
+    for statement, plan in plans:
+        bad = [step for step in plan if step.startswith(BAD_PLAN_STEPS)]
+        assert not bad, f'{" ".join(statement.split())}: {plan}'
@@ -0,0 +1,53 @@
+"""FSM-хранилище: запись пачками и повтор после неудачного flush."""
+import asyncio
+import sqlite3
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from bot.storage import SQLiteStorage, make_key
+
+pytestmark = pytest.mark.anyio
+
+
+def chat(chat_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+
+
+async def test_changes_reach_disk_without_close(tmp_path):
+    path = str(tmp_path / 'fsm.db')
+    storage = SQLiteStorage(path, flush_interval=0.01, cache_size=16)
+    await storage.set_state(chat(1), 'Form:email')
+    await storage.set_data(chat(1), {'page': 2})
+    await asyncio.sleep(0.2)
+    assert not storage._dirty
+    reopened = SQLiteStorage(path, flush_interval=60, cache_size=16)
+    assert await reopened.get_state(chat(1)) == 'Form:email'
+    assert await reopened.get_data(chat(1)) == {'page': 2}
+    await reopened.close()
+    await storage.close()
+
+
+async def test_failed_flush_keeps_keys_evicted_meanwhile(tmp_path):
+    path = str(tmp_path / 'fsm.db')
+    storage = SQLiteStorage(path, flush_interval=60, cache_size=1)
+    await storage.set_data(chat(1), {'page': 2})
+    connect = storage._connect
+
+    async def failing_connect():
+        storage._connect = connect
+        # Пока flush ждёт БД, другие чаты читают своё и вытесняют кэш
+        for chat_id in (2, 3):
+            await storage.get_state(chat(chat_id))
+        raise sqlite3.OperationalError('disk I/O error')
+
+    storage._connect = failing_connect
+    with pytest.raises(sqlite3.OperationalError):
+        await storage.flush()
+    assert storage._dirty == {make_key(chat(1))}
+    await storage.close()
+
+    reopened = SQLiteStorage(path, flush_interval=60, cache_size=16)
+    assert await reopened.get_data(chat(1)) == {'page': 2}
+    await reopened.close()
+
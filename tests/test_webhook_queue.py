@@ -0,0 +1,67 @@
+"""UpdateQueue: порядок внутри чата и отсутствие блокировки между чатами."""
+import asyncio
+import time
+
+import pytest
+
+from bot.webhook import UpdateQueue, chat_key
+
+
+def message(update_id: int, chat_id: int) -> dict:
+    return {'update_id': update_id, 'message': {'chat': {'id': chat_id}}}
+
+
+class SlowDispatcher:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.done = {}
+        self.running = set()
+        self.overlaps = 0
+
+    async def feed_raw_update(self, bot, update):
+        chat_id = chat_key(update)
+        if chat_id in self.running:
+            self.overlaps += 1
+        self.running.add(chat_id)
+        await asyncio.sleep(self.delay)
+        self.running.discard(chat_id)
+        self.done[update['update_id']] = time.perf_counter()
+
+
+@pytest.mark.anyio
+async def test_noisy_chat_does_not_block_other_chats():
+    dispatcher = SlowDispatcher(delay=0.05)
+    updates = UpdateQueue(dispatcher, bot=None, max_concurrency=4, backlog=100)
+    updates.start()
+    for update_id in range(20):
+        assert updates.put_nowait(message(update_id, chat_id=1))
+    sent_at = time.perf_counter()
+    assert updates.put_nowait(message(100, chat_id=2))
+    await updates.close()
+    waited = dispatcher.done[100] - sent_at
+    # Один апдейт чата 2 — около delay, а не 20 апдейтов чата 1
+    assert waited < 0.2
+    assert dispatcher.overlaps == 0
+    chat_1 = sorted(range(20), key=dispatcher.done.__getitem__)
+    assert chat_1 == list(range(20))
+
+
+@pytest.mark.anyio
+async def test_backlog_rejects_overflow():
+    updates = UpdateQueue(
+        SlowDispatcher(0), bot=None, max_concurrency=1, backlog=3
+    )
+    updates.start()
+    accepted = [updates.put_nowait(message(i, chat_id=i)) for i in range(5)]
+    await updates.close()
+    assert accepted == [True, True, True, False, False]
+    assert updates.stats()['rejected'] == 2
+
+
+def test_chat_key():
+    assert chat_key(message(1, 42)) == 42
+    assert chat_key({
+        'update_id': 2,
+        'callback_query': {'message': {'chat': {'id': 7}}, 'from': {'id': 1}},
+    }) == 7
+    assert chat_key({'update_id': 3, 'inline_query': {}}) == ('update', 3)